@@ -0,0 +1,132 @@
+# answer_engine.py
+# Ranked answers for the chat orb, built from ARYAN_FACTS + the keyword FAQ (facts.py).
+# - Questions and keywords are normalised/stemmed (textutil.py), so punctuation and curly quotes don't matter
+# - BM25 over an inverted index: a lookup only touches the postings of the query's terms,
+#   so cost grows with the number of matching facts, not with the size of the table
+# - Very common terms are skipped (MaxScore) only when their combined upper bound can't lift an unseen fact into
+#   the results; the ranking is always the same as scoring every posting
+# - search() returns scored matches; answer() picks the best one above a minimum score. A fact has to share at
+#   least one term besides question words (what/who/how...) with the query, so "how are you" gets the fallback
+
+import heapq
+import math
+import threading
+
+from facts import ARYAN_FACTS, FAQS
+from textutil import INTERROGATIVES, tokenize
+
+K1 = 1.2
+B = 0.75
+KEYWORD_WEIGHT = 2      # a keyword counts like the term appearing this many times in the question
+MIN_SCORE = 1.0
+COMMON_POSTINGS = 256   # longer postings lists are walked only if their terms alone could reach the results
+FALLBACK_ANSWER = "Ask me anything about {first_name} ☕🙂!"
+FIRST_NAME = "Aryan"
+
+class AnswerEngine:
+    def __init__(self, k1=K1, b=B, first_name=FIRST_NAME):
+        self.k1 = k1
+        self.b = b
+        self.fallback = FALLBACK_ANSWER.format(first_name=first_name)   # whose assistant this engine is
+        self.lock = threading.RLock()
+        self.docs = []          # doc id -> {"question", "answer", "length", "tf": {term: frequency}}
+        self.postings = {}      # term -> list of (doc id, term frequency)
+        self.exact = {}         # normalised question -> doc id
+        self.total_length = 0
+
+    @classmethod
+    def from_facts(cls, facts=ARYAN_FACTS, faqs=FAQS, first_name=FIRST_NAME):
+        engine = cls(first_name=first_name)
+        for q, a in facts.items():
+            engine.add(q, a)
+        for faq in faqs:
+            engine.add(faq["q"], faq["a"], faq.get("keywords", ()))
+        return engine
+
+    def add(self, question, answer, keywords=()):
+        terms = tokenize(question)
+        for kw in keywords:
+            terms.extend(tokenize(kw) * KEYWORD_WEIGHT)
+        tf = {}
+        for t in terms:
+            tf[t] = tf.get(t, 0) + 1
+        with self.lock:
+            doc_id = len(self.docs)
+            self.docs.append({"question": question, "answer": answer, "length": len(terms), "tf": tf})
+            for t, n in tf.items():
+                self.postings.setdefault(t, []).append((doc_id, n))
+            self.exact.setdefault(" ".join(tokenize(question, stopwords=(), stemmed=False)), doc_id)
+            self.total_length += len(terms)
+        return doc_id
+
+    def __len__(self):
+        return len(self.docs)
+
+    def search(self, query, k=5):
+        """Return up to k matches as dicts {question, answer, score}, best first (one per distinct answer)."""
+        with self.lock:
+            n_docs = len(self.docs)
+            if not n_docs:
+                return []
+            avg_len = self.total_length / n_docs
+            scores = {}
+            matched = set()     # docs sharing at least one term with the query that isn't a question word
+            terms = sorted((t for t in set(tokenize(query)) if t in self.postings), key=lambda t: len(self.postings[t]))
+            idf = {t: math.log(1 + (n_docs - len(self.postings[t]) + 0.5) / (len(self.postings[t]) + 0.5))
+                   for t in terms}
+            rare = [t for t in terms if len(self.postings[t]) <= COMMON_POSTINGS]
+            common = terms[len(rare):]
+
+            def add(doc_id, tf, t):
+                norm = self.k1 * (1 - self.b + self.b * self.docs[doc_id]["length"] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf[t] * tf * (self.k1 + 1) / (tf + norm)
+                if t not in INTERROGATIVES:
+                    matched.add(doc_id)
+
+            for t in rare:
+                for doc_id, tf in self.postings[t]:
+                    add(doc_id, tf, t)
+            # the rare terms' matches get their common-term contributions from their own term counts
+            for doc_id in list(scores):
+                tfs = self.docs[doc_id]["tf"]
+                for t in common:
+                    if t in tfs:
+                        add(doc_id, tfs[t], t)
+            # a fact matching only common terms scores below idf * (k1 + 1) per term; if even that can't reach
+            # the k * 2 candidates kept below, the long lists needn't be walked
+            scores = {doc_id: s for doc_id, s in scores.items() if doc_id in matched}
+            cutoff = heapq.nlargest(k * 2, scores.values())
+            if common and (len(cutoff) < k * 2 or sum(idf[t] for t in common) * (self.k1 + 1) >= cutoff[-1]):
+                found = set(scores)
+                for t in common:
+                    for doc_id, tf in self.postings[t]:
+                        if doc_id not in found:
+                            add(doc_id, tf, t)
+                scores = {doc_id: s for doc_id, s in scores.items() if doc_id in matched}
+            # the full canonical question typed verbatim always wins
+            exact = self.exact.get(" ".join(tokenize(query, stopwords=(), stemmed=False)))
+            if exact is not None:
+                scores[exact] = max(scores.values(), default=0.0) + 1.0
+            out, seen = [], set()
+            for doc_id, score in heapq.nlargest(k * 2, scores.items(), key=lambda kv: kv[1]):
+                doc = self.docs[doc_id]
+                if doc["answer"] in seen:
+                    continue
+                seen.add(doc["answer"])
+                out.append({"question": doc["question"], "answer": doc["answer"], "score": round(score, 4)})
+                if len(out) == k:
+                    break
+            return out
+
+    def answer(self, query, min_score=MIN_SCORE, default=None):
+        best = self.search(query, k=1)
+        if best and best[0]["score"] >= min_score:
+            return best[0]["answer"]
+        return self.fallback if default is None else default
+
+def normalize_query(query):
+    # canonical cache key for a question: same tokens -> same answer
+    return " ".join(tokenize(query))
+
+# shared instance built from the site's facts
+engine = AnswerEngine.from_facts()
@@ -1,448 +1,209 @@
 # app.py
 # Version 1A — Ultra-Premium Purple–Pink Neon (FULLSCREEN, section-based)
-# Single-file Streamlit app that injects a full-screen HTML/CSS/JS site via components.html.
+# Streamlit app that injects a full-screen HTML/CSS/JS site (templates/index.html) via components.html.
 # - Fullscreen sections (hero, gallery, writings, blog, projects, contact)
 # - Animated nebula/particles background
 # - Glowing hero border with flowing line
 # - Typewriter roles + floating chat orb with local Q&A using provided facts
 # - Gallery reads files from ./gallery/, blog reads from ./blog_posts/
+# - Other portfolios are served from profiles/<slug>/ with ?profile=<slug> (profiles.py)
+# - Anonymous writings are submitted from the sidebar and stored by writings.py (SQLite, group-committed)
+# - Content loading/caching lives in content.py and content_cache.py (shared across reruns & sessions)
+# - Stage timings/payload sizes are collected by instrument.py and shown in the sidebar "Performance" panel
+# - Cold start: heavy imports (markdown, Pillow) happen on first use, new gallery thumbnails render in the
+#   background and later reruns pick them up; STARTUP_METRICS=1 logs import/first-render times
 # IMPORTANT: paste this file into your app folder (alongside gallery/ and blog_posts/)
 
-import os
-import re
-import json
 import time
+run_started = time.perf_counter()  # taken before the other imports so a cold start's import time is counted
+
+import os
+import uuid
+from urllib.parse import quote
 import streamlit as st
 import streamlit.components.v1 as components
-from markdown import markdown
-
-st.set_page_config(page_title="Aryan Sharma — Ultra Premium", layout="wide")
-
-# ---------------- Utility: read gallery & blog posts ----------------
-BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-GALLERY_DIR = os.path.join(BASE_DIR, "gallery")
-POSTS_DIR = os.path.join(BASE_DIR, "blog_posts")
-
-def get_gallery_images():
-    if not os.path.exists(GALLERY_DIR):
-        return []
-    files = sorted(f for f in os.listdir(GALLERY_DIR) if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp", ".gif")))
-    # return relative paths so Streamlit serves them
-    return [os.path.join("gallery", f) for f in files]
-
-def get_post_data(slug):
-    file_path = os.path.join(POSTS_DIR, f"{slug}.md")
-    if not os.path.exists(file_path):
-        return None
-    with open(file_path, "r", encoding="utf-8") as fh:
-        txt = fh.read()
-    meta = {}
-    body = txt
-    m = re.match(r'---\n(.*?)\n---', txt, re.DOTALL)
-    if m:
-        meta_block = m.group(1)
-        for line in meta_block.splitlines():
-            if ':' in line:
-                k,v = line.split(':',1)
-                meta[k.strip()] = v.strip()
-        body = txt[m.end():].strip()
-    return {
-        "slug": slug,
-        "title": meta.get("title", slug.replace('-', ' ').title()),
-        "date": meta.get("date", ""),
-        "author": meta.get("author", ""),
-        "summary": meta.get("summary", ""),
-        "html": markdown(body)
-    }
-
-def get_all_posts():
-    if not os.path.exists(POSTS_DIR):
-        return []
-    mds = sorted(f for f in os.listdir(POSTS_DIR) if f.endswith(".md"))
-    posts = []
-    for m in mds:
-        p = get_post_data(m[:-3])
-        if p:
-            posts.append(p)
-    return posts
-
-# ---------------- Chat facts (client-side) ----------------
-ARYAN_FACTS = {
-    "who is aryan": "Aryan is that guy who turns everyday moments into funny stories without even trying.",
-    "what is aryan currently studying": "Pursuing a Bachelor's degree. 🎓",
-    "what makes aryan smile": "Random jokes, good coffee, and accidental life plot twists.",
-    "what’s aryan’s comfort drink": "Coffee ☕. Without it, he’s basically on airplane mode.",
-    "does aryan like travelling": "Yes! Especially when the trip ends with coffee and mountain views.",
-    "how does aryan handle pressure": "With calmness… and maybe two extra cups of coffee.",
-    "what is aryan good at": "Turning simple moments into mini stories and making people laugh randomly.",
-    "what’s aryan’s vibe": "Chill, creative, and always up for a good conversation.",
-    "is aryan an introvert or extrovert": "Somewhere in between—depends on the energy, the weather, and the wifi.",
-    "what motivates aryan": "New ideas, good music, and that one perfect cup of coffee.",
-    "how does aryan face challenges": "With confidence… and sarcasm when required.",
-    "what’s something aryan can't live without": "Coffee. None 😅.",
-    "what makes aryan unique": "His ability to make people laugh even when he’s not trying.",
-    "what’s aryan’s favorite weather": "Cold breeze + warm coffee = perfection.",
-    "how does aryan relax": "Storytelling, music, and wandering thoughts.",
-    "what is aryan passionate about": "Tech, creativity, and turning ideas into reality.",
-    "what is aryan learning right now": "New tech skills… one coffee at a time.",
-    "what type of person is aryan": "Calm, humorous, and secretly a deep thinker.",
-    "what’s aryan’s favourite thing to do": "Observe life and turn it into funny, relatable stories.",
-    "what does aryan dream about": "A life full of learning, creativity, and a never-ending coffee supply."
-}
-
-facts_json = json.dumps(ARYAN_FACTS)
-
-# ---------------- Build HTML fragments for gallery & posts ----------------
-gallery_imgs = get_gallery_images()
-if gallery_imgs:
-    gallery_html = ""
-    for i, src in enumerate(gallery_imgs):
-        alt = os.path.basename(src)
-        gallery_html += f'<div class="g-item"><img src="{src}" alt="{alt}" loading="lazy"/></div>\n'
-else:
-    gallery_html = '<div class="g-empty">No images found in <code>gallery/</code></div>'
-
-posts = get_all_posts()
-if posts:
-    posts_html = ""
-    for p in posts:
-        title = p["title"]
-        date = p.get("date","")
-        body_html = p["html"]
-        posts_html += f'''
-        <article class="post">
-          <h4 class="post-title">{title}</h4>
-          <div class="post-date">{date}</div>
-          <div class="post-body">{body_html}</div>
-        </article>
-        '''
+from content import (CACHE_DIR, build_gallery_html, build_post_html, build_posts_page_html, build_related_html,
+                     build_search_form_html, build_search_results_html, build_tag_page_html, build_writings_html)
+from content_watcher import watcher
+from gallery_derivatives import SIZES, store as derivative_store
+from instrument import (LATENCY_BUCKETS, bucket_labels, finish_profile, instruments, record, record_size,
+                        record_startup, start_profile, timed, timed_fn)
+from profiles import profile_query, registry
+from site_page import js_literal, render_page, template_version
+from writings import MAX_CHARS as WRITING_MAX_CHARS
+
+imports_done = time.perf_counter()
+
+# ---------------- Profile (tenant) ----------------
+# each profile brings its own content cache, post index, writings store and facts; no ?profile= means this site
+params = st.query_params
+tenant = registry.get(params.get("profile", ""))
+unknown_profile = tenant is None
+tenant = tenant or registry.default
+profile = tenant.profile
+cache, post_index, writing_store = tenant.content, tenant.index, tenant.writings
+# links inside the page keep the profile parameter
+link_query = profile_query(tenant)
+home_href = "?" + link_query.rstrip("&")
+post_href = lambda slug: f"?{link_query}post={quote(slug)}"
+page_href = lambda n: f"?{link_query}page={n}"
+writings_href = lambda n: f"?{link_query}wpage={n}"
+tag_href = lambda tag, n=1: f"?{link_query}tag={quote(tag)}" + (f"&page={n}" if n > 1 else "")
+
+st.set_page_config(page_title=f"{profile['name']} — Ultra Premium", layout="wide")
+if unknown_profile:
+    st.sidebar.warning(f"No profile named `{params['profile']}` — showing the default one.")
+# "Profile next run" (sidebar) sets this flag in a button callback, which runs before the rerun it triggers
+profile_requested = st.session_state.pop("profile_next_run", False)
+profiler = start_profile() if profile_requested else None
+
+# ---------------- Chat facts ----------------
+# with a chat API configured (see chat_server.py) the facts stay server-side instead of shipping in the page
+chat_api = os.environ.get("CHAT_API_URL", "").rstrip("/")
+if chat_api and link_query:
+    chat_api += f"/u/{tenant.slug}"
+
+# ---------------- Anonymous writings ----------------
+# handled before the page is assembled so a new writing shows up in this same run
+with st.sidebar.expander("✍️ Write anonymously", expanded=False):
+    with st.form("anon_writing", clear_on_submit=True):
+        writing_text = st.text_area("Your writing", max_chars=WRITING_MAX_CHARS, label_visibility="collapsed",
+                                    placeholder="Share a thought, a story or a poem — no name attached.")
+        if st.form_submit_button("Post"):
+            try:
+                writing_store.submit(writing_text, session=st.session_state.setdefault("anon_session", uuid.uuid4().hex))
+                st.success("Posted — thank you!")
+            except ValueError as e:
+                st.warning(str(e))
+            except RuntimeError as e:
+                st.error(str(e))
+try:
+    writings_page_no = int(params.get("wpage", 1))
+except ValueError:
+    writings_page_no = 1
+writings_entries, writings_page_no, writings_page_count = writing_store.page(writings_page_no)
+
+# ---------------- Gallery & posts (served from the shared content cache) ----------------
+# gallery/ and blog_posts/ are scanned by one shared watcher thread (content_watcher.py), not by every rerun;
+# with CHAT_API_URL set, open pages get its changes pushed as DOM patches and keep this token to resume from
+content_state = watcher.watch(tenant)
+gallery_imgs = cache.get_gallery_images()
+# thumbnails that already exist are used right away; new photos are queued for the background warmer and show as
+# their originals until it finishes; the run never waits for it (derivatives_version in the page key lets the
+# next rerun use them)
+derivatives_version = derivative_store.version
+derivatives, missing_derivatives = derivative_store.lookup(gallery_imgs)
+if missing_derivatives:
+    derivative_store.warm(missing_derivatives)
+
+# blog: one page of summaries from the post index; a full body is rendered only for ?post=<slug>,
+# ?search=<query> lists ranked full-text matches instead (post_search.py), ?tag=<tag> the posts with that tag;
+# related posts and tag pages are precomputed by the post index (post_related.py)
+open_post = post_index.get(params.get("post", "")) and cache.get_post(params["post"])
+search_query = " ".join(params.get("search", "").split())[:200]
+tag = params.get("tag", "").strip().lower()[:100]
+try:
+    page_no = int(params.get("page", 1))
+except ValueError:
+    page_no = 1
+if tag:
+    page_entries, page_no, page_count = post_index.tag_page(tag, page_no)
 else:
-    posts_html = '<div class="g-empty">No blog posts found (add .md files to blog_posts/)</div>'
+    page_entries, page_no, page_count = post_index.page(page_no)
 
-# ---------------- Socials & meta ----------------
-linkedin = "https://www.linkedin.com/in/aryan-sharma99999"
-instagram = "https://instagram.com/aryanxsharma26"
+# ---------------- Meta ----------------
 year_str = str(time.localtime().tm_year)
 
-# ---------------- Fullscreen HTML (placeholders replaced safely below) ----------------
-html = r"""
-<!doctype html>
-<html>
-<head>
-<meta charset="utf-8"/>
-<meta name="viewport" content="width=device-width,initial-scale=1"/>
-<title>Aryan Sharma — Ultra Premium</title>
-<link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;800&display=swap" rel="stylesheet">
-<style>
-:root{
-  --bgA: #160021;
-  --bgB: #2b003f;
-  --accent1: #ff66d6;
-  --accent2: #6af0ff;
-  --muted: rgba(230,230,255,0.9);
-  --card-bg: rgba(255,255,255,0.02);
-}
-*{box-sizing:border-box}
-html,body{height:100%;margin:0;padding:0;background:linear-gradient(180deg,var(--bgA),var(--bgB));font-family:Inter,system-ui,-apple-system,Segoe UI,Roboto;color:var(--muted);overflow:hidden}
-a{color:var(--accent2);text-decoration:underline}
-
-/* canvas layers (nebula + stars) */
-#bg { position:fixed; inset:0; z-index:-6; }
-.nebula { position:fixed; inset:0; background:
-   radial-gradient(40% 40% at 10% 20%, rgba(255,102,214,0.06), transparent 8%),
-   radial-gradient(60% 40% at 80% 80%, rgba(106,240,255,0.05), transparent 10%);
-   filter:blur(18px) saturate(120%); opacity:0.95; z-index:-5; }
-.stars { position:fixed; inset:0; background-image: radial-gradient(#fff 1px, transparent 1px); background-size:5px 5px; opacity:0.12; z-index:-4 }
-
-/* snap container for fullscreen sections */
-.container { height:100vh; width:100vw; scroll-snap-type: y mandatory; overflow-y: auto; -webkit-overflow-scrolling: touch; }
-
-/* section basics */
-.section { height:100vh; min-height:600px; display:flex; align-items:center; justify-content:center; scroll-snap-align: start; padding:32px; }
-
-/* NAV */
-.navbar { position:fixed; top:18px; left:50%; transform:translateX(-50%); z-index:90; display:flex; gap:10px; padding:8px 12px; border-radius:999px; backdrop-filter:blur(8px); background:linear-gradient(180deg, rgba(255,255,255,0.02), rgba(255,255,255,0.01)); border:1px solid rgba(255,255,255,0.03); }
-.nav-brand{ font-weight:800; letter-spacing:1px; color:#fff; padding-right:8px }
-.nav-link{ padding:8px 10px; border-radius:8px; font-weight:700; cursor:pointer; color:var(--muted) }
-.nav-link:hover{ transform:translateY(-3px); background: rgba(255,255,255,0.02) }
-
-/* HERO card */
-.hero-card{ width:92%; max-width:1100px; padding:56px; border-radius:22px; text-align:center; position:relative; overflow:hidden; background:var(--card-bg); border:1px solid rgba(255,255,255,0.035); box-shadow:0 40px 120px rgba(20,0,40,0.6); backdrop-filter: blur(12px) saturate(140%); }
-.hero-title{ font-size:56px; font-weight:900; margin:0; background:linear-gradient(90deg,var(--accent1),var(--accent2)); -webkit-background-clip:text; color:transparent; }
-.hero-sub{ margin-top:12px; color:rgba(230,230,255,0.9) }
-.role { margin-top:12px; font-weight:800; color:#ffdff8 }
-
-/* animated flowing neon border */
-.hero-card::before{
-  content:""; position:absolute; inset:-3px; border-radius:26px; padding:3px; z-index:0;
-  background: linear-gradient(90deg, rgba(255,102,214,0.0), var(--accent1), var(--accent2), var(--accent1), rgba(255,102,214,0.0));
-  background-size:300% 300%;
-  -webkit-mask: linear-gradient(#fff 0 0) content-box, linear-gradient(#fff 0 0);
-  -webkit-mask-composite: xor;
-  mask-composite: exclude;
-  animation: neonFlow 6s linear infinite;
-  filter: drop-shadow(0 30px 60px rgba(120,40,180,0.18));
-}
-@keyframes neonFlow{ 0%{background-position:0% 50%} 50%{background-position:100% 50%} 100%{background-position:0% 50%} }
-
-/* subtle rings for depth */
-.rings{ position:absolute; left:50%; top:10%; transform:translateX(-50%); z-index:0; pointer-events:none }
-.rings .r1{ width:820px; height:420px; border-radius:50%; border:1px solid rgba(255,255,255,0.02); filter: blur(18px); opacity:0.7; }
-
-/* CTA buttons */
-.cta{ margin-top:18px; display:flex; justify-content:center; gap:12px; z-index:2 }
-.btn{ padding:10px 18px; border-radius:999px; font-weight:800; cursor:pointer; border:none }
-.btn-primary{ background:linear-gradient(90deg,var(--accent1),var(--accent2)); color:#07030a; box-shadow:0 18px 60px rgba(120,40,180,0.12) }
-.btn-ghost{ background:transparent; border:1px solid rgba(255,255,255,0.04); color:var(--muted) }
-
-/* SECTIONS: gallery / content */
-.section-content{ width:100%; max-width:1180px; margin:0 auto; display:grid; grid-template-columns: 1fr 1fr; gap:28px; align-items:start }
-.card{ background:linear-gradient(180deg, rgba(255,255,255,0.02), rgba(255,255,255,0.01)); border-radius:12px; padding:18px; border:1px solid rgba(255,255,255,0.03); box-shadow: 0 18px 60px rgba(6,6,10,0.45); }
-
-/* gallery grid */
-.gallery-grid{ display:grid; grid-template-columns: 1fr 1fr; gap:10px }
-.g-item img{ width:100%; height:160px; object-fit:cover; border-radius:8px; transition:transform .28s ease; cursor:zoom-in }
-.g-item img:hover{ transform:scale(1.04); filter: drop-shadow(0 18px 40px rgba(120,40,180,0.18)) }
-
-/* posts list */
-.posts-list{ display:flex; flex-direction:column; gap:12px }
-.post{ padding:12px; border-radius:10px; background:linear-gradient(180deg, rgba(255,255,255,0.01), rgba(255,255,255,0.005)); border:1px solid rgba(255,255,255,0.02) }
-.post-title{ margin:0; font-weight:800; color:#f7ecff }
-
-/* footer */
-.footer{ text-align:center; padding:30px; color:#d9cfe8 }
-
-/* chat orb */
-.chat-orb{ position:fixed; right:26px; bottom:28px; width:72px; height:72px; border-radius:999px; display:flex; align-items:center; justify-content:center; z-index:95; background:linear-gradient(90deg,var(--accent1),var(--accent2)); color:#07030a; font-weight:900; box-shadow: 0 30px 90px rgba(120,40,180,0.18); cursor:pointer }
-
-/* chat popup */
-.chat-popup{ position:fixed; right:26px; bottom:110px; width:420px; max-width:92vw; border-radius:12px; overflow:hidden; display:none; z-index:96; box-shadow:0 30px 80px rgba(2,2,8,0.7); border:1px solid rgba(255,255,255,0.03) }
-.chat-head{ padding:12px; background:linear-gradient(90deg, rgba(255,255,255,0.02), rgba(255,255,255,0.01)); color:var(--muted); font-weight:800 }
-.chat-body{ padding:12px; max-height:260px; overflow:auto; background: linear-gradient(180deg, rgba(6,6,8,0.98), rgba(8,8,10,0.98)); color:var(--muted) }
-.chat-row{ padding:12px; display:flex; gap:8px; background:linear-gradient(180deg, rgba(255,255,255,0.01), rgba(255,255,255,0.007)) }
-
-/* small screens */
-@media (max-width:900px){
-  .section-content{ grid-template-columns: 1fr; }
-  .hero-title{ font-size:36px }
-  .g-item img{ height:120px }
-}
-</style>
-</head>
-<body>
-  <div id="bg">
-    <div class="nebula" aria-hidden="true"></div>
-    <div class="stars" aria-hidden="true"></div>
-  </div>
-
-  <div class="navbar" role="navigation" aria-label="main-nav">
-    <div class="nav-brand">ARYAN</div>
-    <div class="nav-link" data-target="hero">Home</div>
-    <div class="nav-link" data-target="gallery">Gallery</div>
-    <div class="nav-link" data-target="writings">Writings</div>
-    <div class="nav-link" data-target="blog">Blog</div>
-    <div class="nav-link" data-target="projects">Projects</div>
-  </div>
-
-  <!-- container with scroll snapping -->
-  <div class="container" id="snapContainer" tabindex="0">
-
-    <!-- HERO SECTION -->
-    <section id="hero" class="section" aria-label="Hero">
-      <div class="hero-card" role="region" aria-labelledby="heroTitle">
-        <div class="rings" aria-hidden="true"><div class="r1"></div></div>
-        <h1 class="hero-title" id="heroTitle">ARYAN SHARMA</h1>
-        <div class="hero-sub">I design, build and tell stories through code.</div>
-        <div class="role">I'm a <span id="typeRole">web developer</span></div>
-        <div class="cta" role="group" aria-label="hero actions">
-          <a class="btn btn-primary" href="/resume.pdf" target="_blank" rel="noreferrer">Download Resume</a>
-          <a class="btn btn-ghost" href="__LINKEDIN__" target="_blank" rel="noreferrer">LinkedIn</a>
-          <a class="btn btn-ghost" href="__INSTAGRAM__" target="_blank" rel="noreferrer">Instagram</a>
-        </div>
-      </div>
-    </section>
-
-    <!-- GALLERY + PROJECTS -->
-    <section id="gallery" class="section" aria-label="Gallery & Projects">
-      <div style="width:100%; max-width:1180px; margin:0 auto;" class="section-content">
-        <div class="card">
-          <h3 style="margin-top:0">📸 Photos (Gallery)</h3>
-          <div class="gallery-grid">
-            __GALLERY_HTML__
-          </div>
-        </div>
-        <div class="card">
-          <h3 style="margin-top:0">🧩 Projects</h3>
-          <div style="display:flex;flex-direction:column;gap:12px">
-            <div style="padding:12px;border-radius:8px;background:rgba(255,255,255,0.01);font-weight:700">Chatbot Website<div style="font-weight:400;font-size:13px;opacity:.8">Client-side Q&A demo</div></div>
-            <div style="padding:12px;border-radius:8px;background:rgba(255,255,255,0.01);font-weight:700">Portfolio Builder<div style="font-weight:400;font-size:13px;opacity:.8">Template & theme</div></div>
-            <div style="padding:12px;border-radius:8px;background:rgba(255,255,255,0.01);font-weight:700">AI Experiments<div style="font-weight:400;font-size:13px;opacity:.8">Small ML projects</div></div>
-          </div>
-        </div>
-      </div>
-    </section>
-
-    <!-- WRITINGS + BLOG -->
-    <section id="writings" class="section" aria-label="Writings & Blog">
-      <div style="width:100%; max-width:1180px; margin:0 auto;" class="section-content">
-        <div class="card">
-          <h3 style="margin-top:0">✍️ Writings (Anonymous)</h3>
-          <div id="anonBox" style="min-height:140px">No anonymous writings yet — use the chat or admin to add.</div>
-        </div>
-        <div class="card">
-          <h3 style="margin-top:0">📰 Blog</h3>
-          <div class="posts-list">
-            __POSTS_HTML__
-          </div>
-        </div>
-      </div>
-    </section>
-
-    <!-- CONTACT / FOOTER -->
-    <section id="projects" class="section" aria-label="Contact & Footer">
-      <div style="width:100%; max-width:1180px; margin:0 auto;">
-        <div class="card">
-          <h3 style="margin-top:0">Contact</h3>
-          <p>Connect on <a href="__LINKEDIN__" target="_blank">LinkedIn</a> or <a href="__INSTAGRAM__" target="_blank">Instagram</a>.</p>
-        </div>
-        <div style="height:18px"></div>
-        <div class="card">
-          <h4 style="margin:0">© __YEAR__ Aryan Sharma</h4>
-        </div>
-      </div>
-    </section>
-
-  </div>
-
-  <div class="chat-orb" id="chatOrb" title="Ask me about Aryan">✦</div>
-  <div class="chat-popup" id="chatPopup" aria-hidden="true" role="dialog">
-    <div class="chat-head">Ask me about Aryan ☕ <button id="closeChat" style="float:right;background:transparent;border:none;color:var(--muted);cursor:pointer">✕</button></div>
-    <div class="chat-body" id="chatBody"></div>
-    <div class="chat-row">
-      <input id="chatInput" placeholder="Type a question..." style="flex:1;padding:10px;border-radius:8px;border:1px solid rgba(255,255,255,0.04);background:#0b0b10;color:var(--muted)"/>
-      <button id="chatSend" style="padding:10px 12px;border-radius:8px;border:none;background:linear-gradient(90deg,var(--accent1),var(--accent2));font-weight:800;color:#071026;cursor:pointer">Send</button>
-    </div>
-  </div>
-
-<script>
-// Smooth nav: map nav items
-document.querySelectorAll('.nav-link').forEach(el=>{
-  el.addEventListener('click', ()=> {
-    const id = el.getAttribute('data-target');
-    const sec = document.getElementById(id);
-    if(!sec) return;
-    sec.scrollIntoView({behavior:'smooth', block:'start'});
-  });
-});
-
-// keyboard: up/down to navigate sections
-(function(){
-  const container = document.getElementById('snapContainer');
-  container.addEventListener('wheel', (e)=> {
-    // allow default; CSS snap will lock to nearest
-  }, {passive:true});
-})();
-
-// Typewriter roles
-(function(){
-  const words = ["web developer","tech enthusiast","video editor","writer","learner"];
-  let idx = 0, pos = 0, forward = true;
-  const el = document.getElementById('typeRole');
-  function tick(){
-    const cur = words[idx];
-    if(forward){
-      pos++; el.textContent = cur.slice(0,pos);
-      if(pos === cur.length){ forward=false; setTimeout(tick,900); return; }
-    } else {
-      pos--; el.textContent = cur.slice(0,pos);
-      if(pos === 0){ forward=true; idx=(idx+1)%words.length; setTimeout(tick,400); return; }
-    }
-    setTimeout(tick,70);
-  }
-  tick();
-})();
-
-// Chat: simple client-side Q&A using injected facts
-const ARYAN_FACTS = __FACTS__;
-
-const orb = document.getElementById('chatOrb');
-const popup = document.getElementById('chatPopup');
-const body = document.getElementById('chatBody');
-const input = document.getElementById('chatInput');
-const send = document.getElementById('chatSend');
-const closeBtn = document.getElementById('closeChat');
-
-function addMsg(text, who){
-  const div = document.createElement('div');
-  div.style.margin = '8px 0';
-  div.style.padding = '8px';
-  div.style.borderRadius = '10px';
-  div.style.maxWidth = '90%';
-  if(who === 'user'){ div.style.marginLeft = 'auto'; div.style.background = 'rgba(255,255,255,0.06)'; div.style.color = '#fff'; div.textContent = text; }
-  else { div.style.marginRight = 'auto'; div.style.background = 'linear-gradient(90deg, rgba(120,120,255,0.06), rgba(140,60,200,0.03))'; div.style.color = '#eaf6ff'; div.textContent = text; }
-  body.appendChild(div);
-  body.scrollTop = body.scrollHeight;
-}
-
-orb.addEventListener('click', ()=>{
-  popup.style.display = popup.style.display === 'block' ? 'none' : 'block';
-  if(popup.style.display === 'block' && body.children.length === 0) addMsg("Hi — I'm Aryan's assistant ☕ Ask me anything about Aryan.");
-  input.focus();
-});
-closeBtn.addEventListener('click', ()=> popup.style.display = 'none');
-
-send.addEventListener('click', ()=> {
-  const q = (input.value || '').trim();
-  if(!q) return;
-  addMsg(q, 'user');
-  input.value = '';
-  setTimeout(()=> {
-    const lq = q.toLowerCase();
-    let out = null;
-    for(const k in ARYAN_FACTS){
-      if(lq.includes(k)) { out = ARYAN_FACTS[k]; break; }
-    }
-    if(!out){
-      if(lq.includes('name')) out = "Aryan Sharma — that guy who turns everyday moments into funny stories.";
-      else if(lq.includes('coffee')) out = ARYAN_FACTS["what’s aryan’s comfort drink"] || "Coffee ☕";
-      else out = "Ask me anything about Aryan ☕🙂!";
-    }
-    addMsg(out, 'bot');
-  }, 300 + Math.random()*450);
-});
-input.addEventListener('keydown', (e)=> { if(e.key === 'Enter'){ e.preventDefault(); send.click(); } });
-
-// Lightbox for gallery
-document.querySelectorAll('.g-item img').forEach(img=>{
-  img.addEventListener('click', ()=> {
-    const ov = document.createElement('div'); ov.style.position='fixed'; ov.style.inset=0; ov.style.background='rgba(0,0,0,0.9)'; ov.style.display='flex'; ov.style.alignItems='center'; ov.style.justifyContent='center'; ov.style.zIndex=9999;
-    const big = document.createElement('img'); big.src=img.src; big.style.maxWidth='92%'; big.style.maxHeight='92%'; big.style.borderRadius='10px';
-    ov.appendChild(big);
-    ov.addEventListener('click', ()=> document.body.removeChild(ov));
-    document.body.appendChild(ov);
-  });
-});
-</script>
-</body>
-</html>
-"""
-
-# ---------------- Replace placeholders safely ----------------
-html = html.replace("__GALLERY_HTML__", gallery_html)
-html = html.replace("__POSTS_HTML__", posts_html)
-html = html.replace("__LINKEDIN__", linkedin)
-html = html.replace("__INSTAGRAM__", instagram)
-html = html.replace("__YEAR__", year_str)
-# facts_json contains quotes and braces — inject raw JSON string literal into JS
-html = html.replace("__FACTS__", facts_json)
+# ---------------- Assemble the page from templates/index.html (see site_page.py) ----------------
+@timed_fn("page:build")
+def assemble_page():
+    # js_literal escapes "</", so a profile's facts can't close the <script> they're inlined into
+    facts_json = "{}" if chat_api else js_literal(profile["facts"])
+    hidden = {"profile": tenant.slug} if link_query else None
+    if open_post:
+        posts_html = (build_post_html(open_post, home_href, tag_href)
+                      + build_related_html(post_index.related(open_post["slug"]), post_href))
+    elif tag:
+        posts_html = build_tag_page_html(tag, page_entries, page_no, page_count, post_href, tag_href, home_href)
+    elif search_query:
+        with timed("search"):
+            hits = post_index.search(search_query)
+        posts_html = (build_search_form_html(search_query, hidden)
+                      + build_search_results_html(search_query, hits, post_href, back_href=home_href))
+    else:
+        posts_html = build_search_form_html("", hidden) + build_posts_page_html(page_entries, page_no, page_count,
+                                                                                post_href, page_href, tag_href)
+    writings_html = build_writings_html(writings_entries, writings_page_no, writings_page_count, writings_href)
+    return render_page(build_gallery_html(gallery_imgs, derivatives, SIZES), posts_html, facts_json, chat_api, year_str,
+                       writings_html=writings_html, profile=profile, content_state=content_state)
+
+# the assembled page only changes when posts, gallery, writings, the year or the requested blog/writings view change
+if open_post:
+    view = ("post", open_post["slug"], cache.posts_version)
+else:
+    view = ("search", search_query) if search_query else ("tag", tag, page_no) if tag else ("page", page_no)
+def page_html():
+    with timed("page:lookup"):
+        return cache.get_page(cache.versions() + (post_index.version, writing_store.version, derivatives_version,
+                                                  template_version(), year_str, content_state)
+                              + view + (writings_page_no,), assemble_page, search=view[0] == "search")
 
 # ---------------- Render as a single components.html (scrolling enabled) ----------------
 # Use a large height and let the internal CSS manage full-screen snapping.
+html = page_html()
 components.html(html, height=1100, scrolling=True)
+first_render = time.perf_counter()
+record_size("components.html", len(html.encode("utf-8")))
+registry.touch(tenant)
+record("run", time.perf_counter() - run_started)
+record_startup(imports_done - run_started, first_render - run_started, time.perf_counter() - run_started)
+if profiler is not None:
+    st.session_state["profile_report"] = finish_profile(profiler, os.path.join(CACHE_DIR, "profiles"))
 
 # ---------------- Optional simple admin hints in Streamlit sidebar ----------------
 with st.sidebar.expander("Admin / Notes", expanded=True):
     st.write("• This is Version 1A (Fullscreen section-based). Use left column to view gallery/markdown changes.")
     st.write("• Add images to `gallery/` (jpg/png/webp/gif) to populate gallery.")
-    st.write("• Add markdown files to `blog_posts/` to publish posts.")
+    st.write("• Importing lots of photos? Run `python gallery_ingest.py` first to build thumbnails in parallel and flag duplicates.")
+    st.write("• Add markdown files to `blog_posts/` to publish posts; `tags: travel, music` in the front matter "
+             "adds tag pages, and related posts are linked under each post.")
     st.write("• If you want direct OpenAI-powered chat instead of client-side rules, tell me and I'll wire it in.")
+    st.write("• Server-side chat: run `python chat_server.py` and start Streamlit with `CHAT_API_URL` set "
+             "(replies stream in, and open pages get new photos/posts patched in live; plug a model in with "
+             "`--backend module:callable`, or try `--backend fake`)." + (f" Currently: `{chat_api}`" if chat_api else ""))
+
+# ---------------- Performance panel (instrument.py; counters cover every run since the process started) ----------------
+with st.sidebar.expander("Performance", expanded=False):
+    istats = instruments.stats()
+    labels = bucket_labels(LATENCY_BUCKETS, "ms")
+    st.caption("Stage latency in ms across reruns (histogram columns count calls per bucket)")
+    st.dataframe([dict({"stage": stage, "calls": s["count"], "p50": round(s["p50"], 3), "p95": round(s["p95"], 3),
+                        "max": round(s["max"], 3)}, **dict(zip(labels, s["histogram"])))
+                  for stage, s in sorted(istats["timings"].items())], hide_index=True)
+    payload = istats["sizes"].get("components.html")
+    if payload:
+        st.write(f"• components.html payload: {payload['last']:,.0f} B last, "
+                 f"{payload['p50']:,.0f} B p50, {payload['max']:,.0f} B max")
+    cstats = cache.stats()
+    st.write("• Content cache: " + ", ".join(
+        f"{layer} {cstats[layer]['hits']}/{cstats[layer]['hits'] + cstats[layer]['misses']} hits "
+        f"({cstats[layer]['hit_rate']:.0%})" for layer in ("posts", "gallery", "page")))
+    wstats = writing_store.stats()
+    st.write(f"• Writings store: {wstats['committed']} committed in {wstats['batches']} batches "
+             f"(avg {wstats['avg_batch']:.1f} per commit)")
+    wst = watcher.stats()
+    st.write(f"• Content watcher: {wst['sites']} site(s) watched, {wst['subscribers']} live page(s), "
+             f"{wst['deltas']} change(s) pushed over {wst['polls']} polls")
+    rstats = registry.stats()
+    st.write(f"• Profiles: {rstats['loaded']} loaded besides the default, ~{rstats['bytes'] / 1e6:.1f} of "
+             f"{rstats['max_bytes'] / 1e6:.0f} MB, {rstats['evictions']} evicted "
+             f"({rstats['hits']} hits / {rstats['misses']} loads)")
+    col_profile, col_reset = st.columns(2)
+    col_profile.button("Profile next run", on_click=lambda: st.session_state.update(profile_next_run=True))
+    col_reset.button("Reset counters", on_click=instruments.clear)
+    if profile_requested and profiler is None:
+        st.write("• Another run is being profiled right now; try again in a moment.")
+    if "profile_report" in st.session_state:
+        path, report = st.session_state["profile_report"]
+        st.write(f"• cProfile dump: `{os.path.relpath(path, CACHE_DIR)}` in `.cache/` (open with `snakeviz` or `pstats`)")
+        st.code(report, language="text")
@@ -0,0 +1,282 @@
+# bench.py
+# Benchmark harness: synthetic corpora at growing sizes, timings as JSON, and a baseline compare mode.
+# - N markdown posts with front matter (like blog_posts/hello_world.md), N gallery images, N Q&A facts
+# - Times get_all_posts(), get_gallery_images(), page assembly (fragments + placeholder replacement),
+#   the warm content cache / post index / post search, and chat lookup (BM25 engine vs. the old linear substring scan)
+# - "related" suite: a tagged corpus drawn from topics; times the MinHash/LSH related-posts index (build, one
+#   post changed, lookups), tag pages and the tagged post index build, against an all-pairs scan for small sizes
+#
+# Usage:  python bench.py [--sizes 10,100,1000,10000] [--suites content,related] [--out results.json]
+#                         [--baseline old.json] [--threshold 1.25]
+# Sizes up to 100000 work but the post/gallery corpora take a while to generate;
+# e.g. python bench.py --suites related --sizes 1000,10000,50000 for the related-posts scaling.
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+
+from content import build_gallery_html, build_posts_html, get_all_posts, get_gallery_images
+from content_cache import ContentCache
+from answer_engine import AnswerEngine
+from post_index import PostIndex
+from post_related import RelatedIndex
+from site_page import render_page
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+SUITES = ("content", "related")
+TIME_BUDGET = 1.0           # seconds of repeats per measurement (at least MIN_RUNS)
+MIN_RUNS = 7
+MAX_RUNS = 500
+QUERIES = 200
+NOISE_FLOOR = 500e-6        # slowdowns smaller than this per timed run are scheduler noise, not regressions
+PAIRWISE_MAX = 2000         # the all-pairs related scan is only run up to this many posts
+POSTS_PER_TOPIC = 100       # tagged corpus: topics grow with the corpus, like a real blog's
+WORDS = ("coffee mountain story code travel music writing dream laugh idea weather learning chai trek "
+         "python design sunset notebook friends college cricket guitar rain himachal punjab stars night").split()
+
+# ---------------- synthetic corpora ----------------
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def make_posts(root, n, rng):
+    posts_dir = os.path.join(root, "posts")
+    os.makedirs(posts_dir, exist_ok=True)
+    for i in range(n):
+        day = rng.randint(1, 28)
+        month = rng.choice(("January", "March", "June", "October", "December"))
+        body = "\n\n".join([f"# {sentence(rng, 5)}", sentence(rng), "* " + sentence(rng, 6), "* " + sentence(rng, 6),
+                            "Some **bold** text and a [link](https://example.com). " + sentence(rng, 20)])
+        with open(os.path.join(posts_dir, f"post-{i:06d}.md"), "w", encoding="utf-8") as fh:
+            fh.write(f"---\ntitle: {sentence(rng, 4)}\ndate: {month} {day}, {rng.randint(2015, 2025)}\n"
+                     f"author: Aryan\nslug: post-{i:06d}\nsummary: {sentence(rng, 10)}\n---\n\n{body}\n")
+    return posts_dir
+
+def make_tagged_posts(root, n, rng):
+    # each post mostly uses its topic's own words, with some everyday words and the topic's tags
+    posts_dir = os.path.join(root, "tagged")
+    os.makedirs(posts_dir, exist_ok=True)
+    topics = max(4, n // POSTS_PER_TOPIC)
+    for i in range(n):
+        t = rng.randrange(topics)
+        words = [f"t{t}w{rng.randrange(40)}" if rng.random() < 0.6 else rng.choice(WORDS) for _ in range(80)]
+        tags = [f"topic-{t}", rng.choice(("life", "notes", "travel", "code"))]
+        with open(os.path.join(posts_dir, f"post-{i:06d}.md"), "w", encoding="utf-8") as fh:
+            fh.write(f"---\ntitle: {' '.join(words[:4])}\ndate: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\n"
+                     f"tags: {', '.join(tags)}\n---\n\n{' '.join(words[4:])}\n")
+    return posts_dir
+
+def make_gallery(root, n):
+    # listing and HTML building only look at names, so tiny placeholder files are enough
+    gallery_dir = os.path.join(root, "gallery")
+    os.makedirs(gallery_dir, exist_ok=True)
+    for i in range(n):
+        with open(os.path.join(gallery_dir, f"{i:08x}-0000-4000-8000-{i:012x}.jpg"), "wb") as fh:
+            fh.write(b"\xff\xd8\xff\xd9")
+    return gallery_dir
+
+def make_facts(n, rng):
+    # a couple of common words plus rarer topic words, so the vocabulary grows with the table like real Q&A does
+    vocab = [f"topic{k}" for k in range(max(10, n))]
+    return {f"what about {rng.choice(WORDS)} {rng.choice(vocab)} {rng.choice(vocab)} {i}": sentence(rng, 10)
+            for i in range(n)}
+
+# ---------------- timing ----------------
+def measure(fn):
+    times = []
+    deadline = time.perf_counter() + TIME_BUDGET
+    while len(times) < MIN_RUNS or (time.perf_counter() < deadline and len(times) < MAX_RUNS):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+        if times[0] > TIME_BUDGET and len(times) >= 1:
+            break  # one run of a slow case is enough
+    return {"runs": len(times), "min_s": min(times), "median_s": statistics.median(times), "max_s": max(times)}
+
+def linear_scan(facts, query):
+    # what the page's JS does: first key contained verbatim in the question
+    lq = query.lower()
+    for k, v in facts.items():
+        if k in lq:
+            return v
+    return None
+
+def cold_index_build(posts_dir, index_path):
+    # a full scan plus the sidecar write it leads to
+    index = PostIndex(posts_dir, index_path)
+    index.refresh(force=True)
+    index.flush()
+
+def per_query(stats):
+    # "batch": how many queries one timed run covered, so compare() applies the noise floor to the whole run
+    return dict({k: (v / QUERIES if k.endswith("_s") else v) for k, v in stats.items()}, batch=QUERIES)
+
+def pairwise_related(term_sets, k=5):
+    # the naive alternative: exact Jaccard of every post with every other post, O(n²)
+    top = {}
+    for a, sa in term_sets.items():
+        top[a] = sorted(((len(sa & sb) / len(sa | sb), b) for b, sb in term_sets.items() if b != a), reverse=True)[:k]
+    return top
+
+def bench_related(n, rng, root):
+    posts_dir = make_tagged_posts(root, n, rng)
+    out = {}
+    cold = itertools.count()
+    out["tagged_index_build"] = measure(lambda: cold_index_build(posts_dir, os.path.join(root, f"tagged-{next(cold)}.json")))
+    index = PostIndex(posts_dir, os.path.join(root, "tagged.json"))
+    index.refresh(force=True)
+    index.flush()
+    term_sets = {slug: index._related_terms(slug) for slug in index.order}
+
+    def build():
+        related = RelatedIndex()
+        for slug, terms in term_sets.items():
+            related.add(slug, terms)
+        return related
+    out["related_index_build"] = measure(build)
+    related = index.related_index
+    slug = index.order[0]
+    versions = itertools.cycle((term_sets[slug] | {"edited"}, term_sets[slug]))
+    out["related_update"] = measure(lambda: related.add(slug, next(versions)))
+    slugs = [rng.choice(index.order) for _ in range(QUERIES)]
+    out["related_lookup"] = per_query(measure(lambda: [index.related(s) for s in slugs]))
+    tags = [rng.choice(index.tags())[0] for _ in range(QUERIES)]
+    out["tag_page"] = per_query(measure(lambda: [index.tag_page(t, 1) for t in tags]))
+    if n <= PAIRWISE_MAX:
+        out["related_pairwise"] = measure(lambda: pairwise_related(term_sets))
+    return out
+
+def bench_content(n, rng, root):
+    posts_dir = make_posts(root, n, rng)
+    gallery_dir = make_gallery(root, n)
+    facts = make_facts(n, rng)
+    out = {}
+
+    out["get_all_posts"] = measure(lambda: get_all_posts(posts_dir))
+    out["get_gallery_images"] = measure(lambda: get_gallery_images(gallery_dir))
+
+    posts = get_all_posts(posts_dir)
+    imgs = get_gallery_images(gallery_dir)
+    facts_json = json.dumps(facts)
+    out["page_assembly"] = measure(
+        lambda: render_page(build_gallery_html(imgs), build_posts_html(posts), facts_json, "", "2025"))
+
+    cache = ContentCache(posts_dir, gallery_dir)
+    cache.get_all_posts()
+    out["content_cache_warm"] = measure(lambda: (cache.get_all_posts(), cache.get_gallery_images()))
+
+    index = PostIndex(posts_dir, os.path.join(root, "index.json"))
+    cold = itertools.count()
+    out["post_index_build"] = measure(lambda: cold_index_build(posts_dir, os.path.join(root, f"cold-{next(cold)}.json")))
+    index.refresh(force=True)
+    index.flush()
+    out["post_index_page"] = measure(lambda: index.page(max(1, len(index) // 10)))
+    searches = [" ".join(rng.sample(WORDS, 2)) for _ in range(QUERIES)]
+    out["post_search"] = per_query(measure(lambda: [index.search(q) for q in searches]))
+
+    engine = AnswerEngine()
+    for q, a in facts.items():
+        engine.add(q, a)
+    keys = list(facts)
+    queries = [rng.choice(keys) if i % 2 else sentence(rng, 6) for i in range(QUERIES)]
+    out["chat_lookup_bm25"] = per_query(measure(lambda: [engine.search(q, 3) for q in queries]))
+    out["chat_lookup_linear"] = per_query(measure(lambda: [linear_scan(facts, q) for q in queries]))
+    return out
+
+def bench_size(n, seed=1, suites=SUITES):
+    rng = random.Random(seed + n)
+    root = tempfile.mkdtemp(prefix=f"bench-{n}-")
+    try:
+        out = {}
+        if "content" in suites:
+            out.update(bench_content(n, rng, root))
+        if "related" in suites:
+            out.update(bench_related(n, rng, root))
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def run(sizes, suites=SUITES):
+    results = {}
+    for n in sizes:
+        started = time.perf_counter()
+        for op, stats in bench_size(n, suites=suites).items():
+            results.setdefault(op, {})[str(n)] = stats
+        print(f"size {n}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "sizes": list(sizes), "suites": list(suites)},
+            "results": results}
+
+# ---------------- baseline compare ----------------
+def is_regression(new, old, threshold):
+    # slower by the ratio on both min and median, by more than the noise floor per timed run, and with the new
+    # fastest run outside the baseline's spread (above its median), so one noisy run on either side isn't enough
+    batch = new.get("batch", 1)
+    return (new["min_s"] > old["min_s"] * threshold and new["median_s"] > old["median_s"] * threshold
+            and (new["min_s"] - old["min_s"]) * batch > NOISE_FLOOR
+            and new["min_s"] > old["median_s"])
+
+def compare(current, baseline, threshold):
+    """Return (lines, regressions) comparing min times op by op, size by size (see is_regression)."""
+    lines, regressions = [], []
+    for op, by_size in current["results"].items():
+        for size, stats in by_size.items():
+            base = baseline.get("results", {}).get(op, {}).get(size)
+            if not base:
+                continue
+            new, old = stats["min_s"], base["min_s"]
+            ratio = new / old if old else float("inf")
+            mark = ""
+            if is_regression(stats, base, threshold):
+                mark = "  REGRESSION"
+                regressions.append((op, size, ratio))
+            lines.append(f"  {op:<22} n={size:<7} {old * 1e3:>10.3f} ms -> {new * 1e3:>10.3f} ms  x{ratio:.2f}{mark}")
+    return lines, regressions
+
+def print_table(results):
+    for op, by_size in results["results"].items():
+        cells = "  ".join(f"n={size}: {s['median_s'] * 1e3:.3f}ms" for size, s in by_size.items())
+        print(f"  {op:<22} {cells}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark content loading, page assembly and chat lookup.")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    ap.add_argument("--suites", default=",".join(SUITES), help="comma-separated: " + ", ".join(SUITES))
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = ap.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        ap.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = run(sizes, suites)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+        print_table(results)
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f"compared with {args.baseline} (threshold x{args.threshold}):", file=sys.stderr)
+        print("\n".join(lines), file=sys.stderr)
+        if regressions:
+            print(f"{len(regressions)} regression(s)", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
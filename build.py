@@ -0,0 +1,331 @@
+# build.py
+# Static export: renders the same template as the Streamlit app once into dist/, servable by any static server.
+# - Hero-critical CSS stays inline; the rest of the CSS, the script and the chat facts move to
+#   content-hashed files under dist/assets/ (cache them forever), the facts only fetched when the chat opens
+# - Inter is self-hosted (subsetted) from fonts/ when present; otherwise the Google Fonts stylesheet is
+#   loaded without blocking render, or dropped entirely with --offline
+# - A per-section size report is printed; exceeding a byte budget (--budget name=bytes) fails the build
+# - Gallery originals and their derivatives are copied as hashed assets
+# - index.html + page/N.html carry one page of post summaries each; posts/<slug>.html are pre-rendered
+#   with their related posts; tags/<tag>/index.html + page-N.html list the posts of each tag
+# - Every text output gets precompressed .gz (and .br when the brotli module is installed) siblings
+# - --profile <slug> exports another portfolio from profiles/<slug>/ (profiles.py) instead of this site
+# - Incremental: each output records a key of its inputs in dist/.build-manifest.json and is only
+#   re-rendered/re-written when that key changes; outputs whose source disappeared are removed
+#
+# Usage:  python build.py [--out dist] [--profile slug] [--no-compress] [--clean] [--offline] [--budget css:critical=4000 ...]
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from urllib.parse import quote
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz files are produced without it
+    brotli = None
+
+from build_assets import (BUDGETS, GOOGLE_FONTS_RE, deferred_css_link, font_face, font_weight, ft_subset,
+                          html_sections, local_fonts, size_report, split_critical, subset_font)
+from content import (BASE_DIR, CACHE_DIR, POSTS_DIR, build_gallery_html, build_post_html,
+                     build_posts_page_html, build_related_html, build_tag_page_html, get_gallery_images, get_post_data)
+from gallery_derivatives import SIZES, store as derivative_store
+from post_index import PER_PAGE, PostIndex, INDEX_PATH
+from profiles import default_profile, load_profile
+from site_page import fill_template, load_template, page_values, profile_values
+
+DIST_DIR = os.path.join(BASE_DIR, "dist")
+MANIFEST_NAME = ".build-manifest.json"
+COMPRESS_EXTS = (".html", ".css", ".js", ".json", ".svg", ".txt")
+STYLE_RE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+SCRIPT_RE = re.compile(r'<script>(.*?)</script>', re.DOTALL)
+
+def sha1(data):
+    return hashlib.sha1(data if isinstance(data, bytes) else data.encode("utf-8")).hexdigest()
+
+def hashed_name(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:10]}{ext}"
+
+def page_href_for(prefix):
+    return lambda n: f"{prefix}index.html" if n == 1 else f"{prefix}page/{n}.html"
+
+def post_href_for(prefix):
+    return lambda slug: f"{prefix}posts/{quote(slug)}.html"
+
+def tag_page_rel(tag, n):
+    return f"tags/{tag}/index.html" if n == 1 else f"tags/{tag}/page-{n}.html"
+
+def tag_href_for(prefix):
+    return lambda tag, n=1: prefix + quote(tag_page_rel(tag, n))
+
+class Builder:
+    def __init__(self, out_dir=DIST_DIR, posts_dir=None, gallery_dir=None, compress=True, chat_api="",
+                 offline=False, profile=None):
+        self.out_dir = out_dir
+        self.offline = offline
+        self.report_rows = {}
+        self.profile = profile or default_profile()
+        self.posts_dir = posts_dir or self.profile["posts_dir"]
+        self.gallery_dir = gallery_dir or self.profile["gallery_dir"]
+        self.compress = compress
+        self.chat_api = chat_api
+        self.manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                self.manifest = json.load(fh)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.old_outputs = self.manifest.get("outputs", {})
+        self.outputs = {}           # rel path -> input key, for this run
+        self.sources = self.manifest.get("sources", {})     # source path -> [sig, sha1], avoids re-hashing
+        self.counts = {"written": 0, "unchanged": 0, "removed": 0}
+
+    # ---------------- low-level output ----------------
+    def _path(self, rel):
+        return os.path.join(self.out_dir, *rel.split("/"))
+
+    def _write_file(self, rel, data):
+        path = self._path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        if self.compress and rel.endswith(COMPRESS_EXTS):
+            with open(path + ".gz", "wb") as fh:
+                fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(path + ".br", "wb") as fh:
+                    fh.write(brotli.compress(data))
+
+    def up_to_date(self, rel, key):
+        return self.old_outputs.get(rel) == key and os.path.exists(self._path(rel))
+
+    def emit(self, rel, key, render):
+        """Write render() to rel unless its input key matches the last build; render is only called when needed."""
+        self.outputs[rel] = key
+        if self.up_to_date(rel, key):
+            self.counts["unchanged"] += 1
+            return
+        data = render()
+        self._write_file(rel, data if isinstance(data, bytes) else data.encode("utf-8"))
+        self.counts["written"] += 1
+
+    def source_hash(self, path):
+        st = os.stat(path)
+        sig = [st.st_mtime_ns, st.st_size]
+        known = self.sources.get(path)
+        if known and known[0] == sig:
+            return known[1]
+        with open(path, "rb") as fh:
+            digest = sha1(fh.read())
+        self.sources[path] = [sig, digest]
+        return digest
+
+    def copy_asset(self, src_path, subdir="assets"):
+        # content-hashed name: unchanged files keep their URL, changed ones get a new one
+        digest = self.source_hash(src_path)
+        rel = f"{subdir}/{hashed_name(os.path.basename(src_path), digest)}"
+
+        def read():
+            with open(src_path, "rb") as fh:
+                return fh.read()
+        self.emit(rel, digest, read)
+        return rel
+
+    def text_asset(self, name, text):
+        digest = sha1(text)
+        rel = f"assets/{hashed_name(name, digest)}"
+        self.emit(rel, digest, lambda: text)
+        return rel
+
+    def fonts(self):
+        """Self-host Inter from fonts/: returns @font-face CSS (URLs carry __ASSET_PREFIX__) or "" when none."""
+        faces = []
+        flavor = "woff2" if brotli is not None else "woff"
+        for path in local_fonts():
+            name = os.path.basename(path)
+            if ft_subset is not None:
+                name = os.path.splitext(name)[0] + "." + flavor
+                key = sha1(self.source_hash(path) + flavor)
+                rel = f"assets/fonts/{hashed_name(name, key)}"
+                self.emit(rel, key, lambda path=path: subset_font(path, flavor))
+            else:
+                rel = self.copy_asset(path, "assets/fonts")
+            ext = os.path.splitext(rel)[1][1:]
+            fmt = {"ttf": "truetype", "otf": "opentype"}.get(ext, ext)
+            faces.append(font_face(f"__ASSET_PREFIX__{rel}", font_weight(path), fmt))
+            with open(self._path(rel), "rb") as fh:
+                self.report_rows[f"font:{os.path.basename(rel)}"] = fh.read()
+        return "".join(faces)
+
+    # ---------------- site ----------------
+    def static_template(self, facts_json):
+        # inline only the hero's CSS; deferred CSS, script and chat facts become hashed files
+        template = load_template()
+        css = STYLE_RE.search(template)
+        critical, deferred = split_critical(css.group(1))
+        critical = self.fonts() + critical
+        deferred_rel = self.text_asset("site.css", deferred)
+        facts_rel = self.text_asset("facts.json", facts_json) if not self.chat_api else ""
+        js = SCRIPT_RE.search(template)
+        # an exported page isn't tied to a content_watcher state, so it doesn't subscribe to live updates
+        script = fill_template(js.group(1), {"FACTS": "{}", "FACTS_URL": os.path.basename(facts_rel),
+                                             "CHAT_API": self.chat_api, "CONTENT_STATE": "",
+                                             **profile_values(self.profile)}).strip() + "\n"
+        js_rel = self.text_asset("site.js", script)
+        self.report_rows.update({"css:critical": critical, "css:deferred": deferred, "js:site": script})
+        if facts_rel:
+            self.report_rows["data:facts"] = facts_json
+
+        head_css = f"<style>\n{critical}</style>\n" + deferred_css_link(f"__ASSET_PREFIX__{deferred_rel}")
+        template = template[:css.start()] + head_css + template[css.end():]
+        fonts_link = GOOGLE_FONTS_RE.search(template)
+        if fonts_link:
+            if "@font-face" in critical or self.offline:
+                replacement = ""
+            else:
+                href = re.search(r'href="([^"]*)"', fonts_link.group(0)).group(1)
+                replacement = ('<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+                               + deferred_css_link(href) + "\n")
+            template = template[:fonts_link.start()] + replacement + template[fonts_link.end():]
+        js = SCRIPT_RE.search(template)
+        return template[:js.start()] + f'<script src="__ASSET_PREFIX__{js_rel}" defer></script>' + template[js.end():]
+
+    def gallery_urls(self):
+        imgs = get_gallery_images(self.gallery_dir)
+        derivatives = derivative_store.for_images(imgs)
+        urls = {}
+        for src in imgs:
+            urls[src] = self.copy_asset(os.path.join(BASE_DIR, src), "assets/img")
+            rec = derivatives.get(src)
+            for pairs in (rec or {}).get("variants", {}).values():
+                for _, path in pairs:
+                    urls[path] = self.copy_asset(os.path.join(BASE_DIR, path), "assets/img")
+        return imgs, derivatives, urls
+
+    def render(self, template, prefix, gallery_html, posts_html, year_str):
+        # the facts were already baked into the hashed script by static_template()
+        values = page_values(gallery_html, posts_html, "", self.chat_api, year_str, profile=self.profile)
+        values["ASSET_PREFIX"] = prefix
+        return fill_template(template, values)
+
+    def run(self):
+        start = time.perf_counter()
+        facts_json = "{}" if self.chat_api else json.dumps(self.profile["facts"])
+        template = self.static_template(facts_json)
+        year_str = str(time.localtime().tm_year)
+
+        imgs, derivatives, urls = self.gallery_urls()
+        galleries = {p: build_gallery_html(imgs, derivatives, SIZES, url=lambda path, p=p: p + urls.get(path, path))
+                     for p in ("", "../", "../../")}
+        common = sha1(json.dumps([template, galleries[""], year_str, profile_values(self.profile)]))
+
+        index_path = INDEX_PATH if self.posts_dir == POSTS_DIR else os.path.join(CACHE_DIR, f"post_index-{sha1(self.posts_dir)[:10]}.json")
+        index = PostIndex(self.posts_dir, index_path)
+        index.refresh(force=True)
+        index.flush()
+        _, _, pages = index.page(1, PER_PAGE)
+        for n in range(1, pages + 1):
+            entries, _, _ = index.page(n, PER_PAGE)
+            rel = "index.html" if n == 1 else f"page/{n}.html"
+            prefix = "" if n == 1 else "../"
+            key = sha1(json.dumps([common, n, pages, entries]))
+            self.emit(rel, key, lambda entries=entries, n=n, prefix=prefix: self.render(
+                template, prefix, galleries[prefix],
+                build_posts_page_html(entries, n, pages, post_href_for(prefix), page_href_for(prefix),
+                                      tag_href_for(prefix)), year_str))
+
+        for slug in index.order:
+            entry = index.get(slug)
+            related = index.related(slug)
+            key = sha1(json.dumps([common, entry, related]))
+
+            def render_post(slug=slug, related=related):
+                post = get_post_data(slug, self.posts_dir)
+                return self.render(template, "../", galleries["../"],
+                                   build_post_html(post, "../index.html", tag_href_for("../"))
+                                   + build_related_html(related, post_href_for("../")), year_str)
+            self.emit(f"posts/{slug}.html", key, render_post)
+
+        for tag, _ in index.tags():
+            _, _, pages = index.tag_page(tag, 1, PER_PAGE)
+            for n in range(1, pages + 1):
+                entries, _, _ = index.tag_page(tag, n, PER_PAGE)
+                key = sha1(json.dumps([common, tag, n, pages, entries]))
+                self.emit(tag_page_rel(tag, n), key, lambda tag=tag, entries=entries, n=n, pages=pages: self.render(
+                    template, "../../", galleries["../../"],
+                    build_tag_page_html(tag, entries, n, pages, post_href_for("../../"), tag_href_for("../../"),
+                                        "../../index.html"), year_str))
+
+        self.remove_stale()
+        self.manifest = {"outputs": self.outputs, "sources": {k: v for k, v in self.sources.items() if os.path.exists(k)}}
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh, indent=0)
+        self.counts["seconds"] = round(time.perf_counter() - start, 3)
+        with open(self._path("index.html"), "r", encoding="utf-8") as fh:
+            self.report_rows = {**html_sections(fh.read()), **self.report_rows}
+        return self.counts
+
+    def remove_stale(self):
+        for rel in self.old_outputs:
+            if rel in self.outputs:
+                continue
+            for suffix in ("", ".gz", ".br"):
+                try:
+                    os.remove(self._path(rel) + suffix)
+                except OSError:
+                    pass
+            self.counts["removed"] += 1
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export the site as static files.")
+    ap.add_argument("--out", default=DIST_DIR)
+    ap.add_argument("--no-compress", action="store_true", help="skip .gz/.br siblings")
+    ap.add_argument("--clean", action="store_true", help="delete the output directory first (full rebuild)")
+    ap.add_argument("--offline", action="store_true",
+                    help="no third-party requests: drop the Google Fonts stylesheet when fonts/ has no Inter files")
+    ap.add_argument("--budget", action="append", default=[], metavar="NAME=BYTES",
+                    help="gzip byte budget for a report row (e.g. css:critical=4000, total=80000); repeatable")
+    ap.add_argument("--chat-api", default=os.environ.get("CHAT_API_URL", "").rstrip("/"),
+                    help="chat_server.py URL the exported page should ask (default: $CHAT_API_URL)")
+    ap.add_argument("--profile", help="export profiles/<slug>/ instead of this site")
+    args = ap.parse_args(argv)
+    profile = None
+    if args.profile:
+        profile = load_profile(args.profile)
+        if profile is None:
+            ap.error(f"no valid profile at profiles/{args.profile}/profile.json")
+        if args.chat_api:
+            args.chat_api += f"/u/{args.profile}"     # chat_server.py serves other profiles under /u/<slug>/
+    if args.clean and os.path.isdir(args.out):
+        shutil.rmtree(args.out)
+    budgets = dict(BUDGETS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        try:
+            budgets[name.strip()] = int(value)
+        except ValueError:
+            ap.error(f"invalid --budget {item!r}, expected NAME=BYTES")
+    builder = Builder(args.out, compress=not args.no_compress, chat_api=args.chat_api, offline=args.offline,
+                      profile=profile)
+    counts = builder.run()
+    print(f"built {args.out}: {counts['written']} written, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed in {counts['seconds']}s")
+    lines, failures = size_report(builder.report_rows, budgets)
+    print("size report (first visit, images excluded):")
+    print("\n".join(lines))
+    for name, size, budget in failures:
+        print(f"budget exceeded: {name} is {size} B gz, budget {budget} B", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
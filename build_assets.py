@@ -0,0 +1,168 @@
+# build_assets.py
+# Asset stages for the static export (build.py):
+# - critical CSS: rules needed to paint the hero (nav, background, hero card, buttons) are inlined,
+#   everything else is loaded without blocking render
+# - Inter font: subsetted from local files in fonts/ (fontTools, optional) instead of the Google Fonts stylesheet
+# - size report per page section / asset with byte budgets (gzip bytes) that fail the build when exceeded
+
+import io
+import os
+import re
+import gzip
+
+try:
+    from fontTools import subset as ft_subset
+except ImportError:  # optional: without it local fonts are copied whole
+    ft_subset = None
+
+from content import BASE_DIR
+
+FONTS_DIR = os.path.join(BASE_DIR, "fonts")
+GOOGLE_FONTS_RE = re.compile(r'<link href="https://fonts\.googleapis\.com/[^"]*" rel="stylesheet">\n?')
+
+# selectors whose first compound starts with one of these paint the first screen
+CRITICAL_SELECTORS = (":root", "*", "html", "body", "a", "#bg", ".nebula", ".stars", ".container", ".section",
+                      ".navbar", ".nav-brand", ".nav-link", ".hero-card", ".hero-title", ".hero-sub", ".role",
+                      ".rings", ".cta", ".btn", ".btn-primary", ".btn-ghost")
+CRITICAL_KEYFRAMES = ("neonFlow",)
+
+# Basic Latin, Latin-1, Latin Extended-A and general punctuation (curly quotes, dashes, ellipsis, arrows)
+FONT_UNICODES = [*range(0x20, 0x7F), *range(0xA0, 0x180), *range(0x2010, 0x2070), 0x2190, 0x2192, 0x2122]
+FONT_WEIGHTS = {"thin": 100, "extralight": 200, "light": 300, "regular": 400, "medium": 500,
+                "semibold": 600, "bold": 700, "extrabold": 800, "black": 900}
+
+# gzip bytes per report row; "total" is what a first visit downloads before any interaction (images excluded)
+BUDGETS = {
+    "html:hero": 2_500,
+    "html:total": 12_000,
+    "css:critical": 3_000,
+    "css:deferred": 3_000,
+    "js:site": 5_000,
+    "data:facts": 2_000,
+    "total": 60_000,
+}
+
+# ---------------- CSS ----------------
+def strip_comments(css):
+    return re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+
+def css_blocks(css):
+    """Split a stylesheet into top-level (prelude, body) pairs; @media bodies keep their nested rules."""
+    blocks, i, n = [], 0, len(css)
+    while i < n:
+        start = css.find("{", i)
+        if start < 0:
+            break
+        depth, j = 1, start + 1
+        while j < n and depth:
+            depth += {"{": 1, "}": -1}.get(css[j], 0)
+            j += 1
+        prelude = css[i:start].strip()
+        if prelude:
+            blocks.append((prelude, css[start + 1:j - 1]))
+        i = j
+    return blocks
+
+def first_compound(selector):
+    m = re.match(r'\s*(:root|\*|[#.]?[\w-]+)', selector)
+    return m.group(1) if m else ""
+
+def is_critical(prelude):
+    if prelude.startswith("@keyframes"):
+        return prelude.split()[-1] in CRITICAL_KEYFRAMES
+    return any(first_compound(sel) in CRITICAL_SELECTORS for sel in prelude.split(","))
+
+def split_critical(css):
+    """Return (critical_css, deferred_css) for the given stylesheet."""
+    critical, deferred = [], []
+    for prelude, body in css_blocks(strip_comments(css)):
+        if prelude.startswith("@media"):
+            inner_c, inner_d = split_critical(body)
+            if inner_c:
+                critical.append(f"{prelude}{{\n{inner_c}}}\n")
+            if inner_d:
+                deferred.append(f"{prelude}{{\n{inner_d}}}\n")
+            continue
+        rule = f"{prelude}{{{' '.join(body.split())}}}\n"
+        (critical if is_critical(prelude) else deferred).append(rule)
+    return "".join(critical), "".join(deferred)
+
+def deferred_css_link(href):
+    # preload + swap keeps the stylesheet off the critical path; noscript covers the no-JS case
+    return (f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+# ---------------- fonts ----------------
+def local_fonts(fonts_dir=FONTS_DIR):
+    if not os.path.isdir(fonts_dir):
+        return []
+    return sorted(os.path.join(fonts_dir, f) for f in os.listdir(fonts_dir)
+                  if f.lower().startswith("inter") and f.lower().endswith((".ttf", ".otf", ".woff", ".woff2")))
+
+def font_weight(path):
+    name = os.path.splitext(os.path.basename(path))[0].lower().replace("-", "").replace("_", "")
+    if "[" in name or "variable" in name:
+        return "100 900"
+    for label in sorted(FONT_WEIGHTS, key=len, reverse=True):
+        if name.endswith(label) or name.endswith(label + "italic"):
+            return str(FONT_WEIGHTS[label])
+    return "400"
+
+def subset_font(path, flavor):
+    """Subset a font file to FONT_UNICODES; returns the font bytes (requires fontTools)."""
+    opts = ft_subset.Options()
+    opts.flavor = flavor
+    opts.layout_features = ["*"]
+    opts.name_IDs = ["*"]
+    font = ft_subset.load_font(path, opts)
+    sub = ft_subset.Subsetter(opts)
+    sub.populate(unicodes=FONT_UNICODES)
+    sub.subset(font)
+    out = io.BytesIO()
+    ft_subset.save_font(font, out, opts)
+    return out.getvalue()
+
+def font_face(url, weight, fmt):
+    return (f"@font-face{{font-family:Inter;font-style:normal;font-weight:{weight};font-display:swap;"
+            f"src:url({url}) format('{fmt}')}}\n")
+
+# ---------------- size report ----------------
+def gz_size(data):
+    data = data if isinstance(data, bytes) else data.encode("utf-8")
+    return len(gzip.compress(data, compresslevel=9, mtime=0))
+
+def html_sections(page):
+    """Split a rendered page into its <head>, each <section id=...> and the whole document."""
+    rows = {"html:head": page[:page.find("<body>")]}
+    for m in re.finditer(r'<section id="([\w-]+)".*?</section>', page, re.DOTALL):
+        rows[f"html:{m.group(1)}"] = m.group(0)
+    rows["html:total"] = page
+    return rows
+
+def counts_toward_total(name):
+    # html sections are already inside html:total; critical CSS is inline; chat facts load only on demand
+    return name == "html:total" or not (name.startswith("html:") or name in ("css:critical", "data:facts"))
+
+def size_report(rows, budgets):
+    """rows: {name: str|bytes}. Returns (report lines, [(name, gzip bytes, budget), ...] over budget)."""
+    lines, failures = [], []
+    width = max(len(k) for k in list(rows) + ["total"])
+
+    def line(name, raw, gz):
+        budget = budgets.get(name)
+        flag = ""
+        if budget is not None:
+            flag = f"  / {budget:>7} budget" + ("  OVER" if gz > budget else "")
+            if gz > budget:
+                failures.append((name, gz, budget))
+        raw_col = f"{raw:>8} B raw" if raw is not None else " " * 14
+        lines.append(f"  {name:<{width}} {raw_col} {gz:>8} B gz{flag}")
+
+    total = 0
+    for name, data in rows.items():
+        gz = gz_size(data)
+        if counts_toward_total(name):
+            total += gz
+        line(name, len(data if isinstance(data, bytes) else data.encode("utf-8")), gz)
+    line("total", None, total)
+    return lines, failures
@@ -0,0 +1,523 @@
+# chat_server.py
+# Optional server-side chat API that runs next to the Streamlit app.
+# - One fact store (answer_engine.py) instead of shipping the facts table inside every page
+# - Answers for normalised questions are kept in an LRU cache with a TTL
+# - Identical questions arriving concurrently share a single backend call (or, when streamed, a single backend stream)
+# - Backends are pluggable; blocking ones (e.g. an LLM client) run in a thread pool, off the event loop
+# - GET /chat/stream?q=... streams the answer as Server-Sent Events, chunk by chunk, from a Python generator;
+#   the stream stops (and the generator is closed) as soon as the last client listening to it disconnects
+# - GET /search?q=... returns ranked blog posts with highlighted snippets (post_index.py / post_search.py)
+# - GET /events?state=... streams content changes (content_watcher.py) to open pages as SSE deltas that patch
+#   the gallery and blog in place; one watcher thread serves every connection
+# - GET /stats reports p50/p99 latency and cache counters
+# - Other profiles (profiles.py) are served under a /u/<slug>/ prefix (or ?profile=<slug>), e.g. /u/demo/chat/stream,
+#   each with its own answer cache and fact store; a custom --backend is shared by all of them
+#
+# Usage:  python chat_server.py [--host 127.0.0.1] [--port 8502] [--backend local|fake|module:callable]
+# then start Streamlit with CHAT_API_URL=http://127.0.0.1:8502 so the orb asks this server.
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import importlib
+import threading
+import weakref
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+from answer_engine import engine as default_engine, normalize_query
+from content_watcher import watcher
+from instrument import percentile
+from profiles import registry
+
+CACHE_SIZE = 1024
+CACHE_TTL = 300.0           # seconds
+LATENCY_WINDOW = 10000      # most recent requests kept for percentiles
+MAX_QUESTION_CHARS = 500
+MAX_BODY_BYTES = 16 * 1024
+KEEPALIVE = 15.0            # seconds between SSE comments on an idle /events stream (notices closed tabs)
+MAX_TENANT_SERVICES = 256   # profiles with a live chat service (answer cache, latency window) at once
+
+# ---------------- LRU + TTL cache ----------------
+class LRUCache:
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.data = OrderedDict()   # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None or item[0] < self.clock():
+                if item is not None:
+                    del self.data[key]
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = (self.clock() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"size": len(self.data), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": (self.hits / total) if total else 0.0}
+
+# ---------------- latency tracking ----------------
+class LatencyStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        vals = sorted(self.samples)
+        return {"count": self.count, "p50_ms": round(percentile(vals, 50) * 1000, 3),
+                "p99_ms": round(percentile(vals, 99) * 1000, 3),
+                "max_ms": round((vals[-1] if vals else 0.0) * 1000, 3)}
+
+# ---------------- backends ----------------
+class LocalBackend:
+    # the in-process BM25 engine: microseconds per lookup, fine to run on the loop
+    blocking = False
+
+    def __init__(self, engine=default_engine):
+        self.engine = engine
+
+    def __call__(self, question):
+        return self.engine.answer(question)
+
+def word_chunks(text):
+    # "a b c" -> "a", " b", " c": joining the chunks gives back the exact text
+    words = text.split(" ")
+    yield words[0]
+    for w in words[1:]:
+        yield " " + w
+
+class FakeStreamingBackend:
+    # deterministic stand-in for a slow model: the local answer, one word every `delay` seconds
+    blocking = True
+
+    def __init__(self, engine=default_engine, delay=0.04):
+        self.engine = engine
+        self.delay = delay
+
+    def __call__(self, question):
+        return "".join(self.stream(question))
+
+    def stream(self, question):
+        for i, chunk in enumerate(word_chunks(self.engine.answer(question))):
+            if i and self.delay:
+                time.sleep(self.delay)
+            yield chunk
+
+class ThreadedBackend:
+    # wraps any blocking callable(question) -> str, e.g. an LLM client, so it runs in the default executor
+    blocking = True
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, question):
+        return self.fn(question)
+
+def load_backend(spec):
+    if not spec or spec == "local":
+        return LocalBackend()
+    if spec == "fake":
+        return FakeStreamingBackend()
+    module_name, _, attr = spec.partition(":")
+    fn = getattr(importlib.import_module(module_name), attr or "answer")
+    return fn if hasattr(fn, "blocking") else ThreadedBackend(fn)
+
+# ---------------- chat service ----------------
+class SharedStream:
+    # chunks produced so far for one question; every listener replays them from the start, then waits for more
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.consumers = 0
+        self.task = None
+        self.changed = asyncio.Condition()
+
+class ChatService:
+    def __init__(self, backend=None, cache=None):
+        self.backend = backend or LocalBackend()
+        self.cache = cache or LRUCache()
+        self.in_flight = {}         # normalised question -> Future shared by concurrent askers
+        self.streams = {}           # normalised question -> SharedStream fanned out to concurrent streamers
+        self.latency = LatencyStats()
+        self.coalesced = 0
+
+    async def _compute(self, question):
+        if getattr(self.backend, "blocking", True):
+            return await asyncio.get_running_loop().run_in_executor(None, self.backend, question)
+        return self.backend(question)
+
+    async def ask(self, question):
+        start = time.perf_counter()
+        try:
+            key = normalize_query(question)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            fut = self.in_flight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return await asyncio.shield(fut)
+            fut = asyncio.get_running_loop().create_future()
+            self.in_flight[key] = fut
+            try:
+                answer = await self._compute(question)
+                self.cache.put(key, answer)
+                fut.set_result(answer)
+                return answer
+            except BaseException as e:
+                fut.set_exception(e)
+                fut.exception()  # mark retrieved when nobody else was waiting
+                raise
+            finally:
+                del self.in_flight[key]
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+    async def stream(self, question):
+        """Yield answer chunks as the backend produces them; a cached answer comes back as one chunk.
+
+        Concurrent askers of the same (normalised) question share one backend stream, like ask() shares one call.
+        """
+        start = time.perf_counter()
+        key = normalize_query(question)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.latency.record(time.perf_counter() - start)
+            yield cached
+            return
+        if getattr(self.backend, "stream", None) is None:
+            yield await self.ask(question)
+            return
+        shared = self.streams.get(key)
+        if shared is None:
+            shared = self.streams[key] = SharedStream()
+            shared.task = asyncio.get_running_loop().create_task(self._produce(key, question, shared))
+        else:
+            self.coalesced += 1
+        shared.consumers += 1
+        first = None
+        sent = 0
+        try:
+            while True:
+                async with shared.changed:
+                    await shared.changed.wait_for(lambda: sent < len(shared.chunks) or shared.done)
+                    chunks = shared.chunks[sent:]
+                for chunk in chunks:
+                    if first is None:
+                        # time to first chunk is what the user feels
+                        first = time.perf_counter() - start
+                        self.latency.record(first)
+                    yield chunk
+                sent += len(chunks)
+                if shared.done and sent == len(shared.chunks):
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+        finally:
+            if first is None:
+                self.latency.record(time.perf_counter() - start)
+            shared.consumers -= 1
+            if not shared.consumers and not shared.done:
+                # the last listener left (e.g. closed the tab): stop the backend, and let new askers start afresh
+                if self.streams.get(key) is shared:
+                    del self.streams[key]
+                shared.task.cancel()
+
+    async def _produce(self, key, question, shared):
+        # one task per shared stream: pulls chunks from the backend's generator and wakes every listener
+        blocking = getattr(self.backend, "blocking", True)
+        loop = asyncio.get_running_loop()
+        gen = self.backend.stream(question)
+        done = object()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, next, gen, done) if blocking else next(gen, done)
+                if chunk is done:
+                    break
+                async with shared.changed:
+                    shared.chunks.append(chunk)
+                    shared.changed.notify_all()
+            self.cache.put(key, "".join(shared.chunks))
+        except Exception as e:
+            shared.error = e
+        finally:
+            if self.streams.get(key) is shared:
+                del self.streams[key]
+            async with shared.changed:
+                shared.done = True
+                shared.changed.notify_all()
+            if hasattr(gen, "close"):
+                try:
+                    if blocking:
+                        await loop.run_in_executor(None, gen.close)
+                    else:
+                        gen.close()
+                except ValueError:
+                    pass  # a worker thread is still inside next(); the generator is dropped after that chunk
+
+    def stats(self):
+        return {"latency": self.latency.summary(), "cache": self.cache.stats(),
+                "coalesced": self.coalesced, "in_flight": len(self.in_flight) + len(self.streams)}
+
+# ---------------- one service per profile ----------------
+def tenant_backend(backend, engine):
+    # the built-in backends answer from a fact store, so each profile gets its own; anything else is shared
+    if type(backend) is LocalBackend:
+        return LocalBackend(engine)
+    if type(backend) is FakeStreamingBackend:
+        return FakeStreamingBackend(engine, backend.delay)
+    return backend
+
+class TenantServices:
+    def __init__(self, default, cache_size=CACHE_SIZE, ttl=CACHE_TTL, max_services=MAX_TENANT_SERVICES):
+        self.default = default
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.max_services = max_services
+        # slug -> (weak reference to its Tenant, ChatService), least recently used first; the tenant itself
+        # (content cache, post index) belongs to the registry, so evicting it there frees it here too
+        self.services = OrderedDict()
+
+    def get(self, slug):
+        """(tenant, ChatService) for a profile slug ("" = the default profile), or (None, None) if it doesn't exist."""
+        tenant = registry.get(slug)
+        if tenant is None:
+            return None, None
+        if tenant is registry.default:
+            return tenant, self.default
+        known = self.services.get(slug)
+        if known is not None and known[0]() is tenant:
+            self.services.move_to_end(slug)
+            return tenant, known[1]
+        # first request, or the registry reloaded (or evicted and reloaded) the profile since
+        for other, (ref, _) in list(self.services.items()):
+            t = ref()
+            if t is None or t.closed:
+                del self.services[other]
+        service = ChatService(tenant_backend(self.default.backend, tenant.engine), LRUCache(self.cache_size, self.ttl))
+        self.services[slug] = (weakref.ref(tenant), service)
+        while len(self.services) > self.max_services:
+            self.services.popitem(last=False)
+        return tenant, service
+
+    def stats(self):
+        return dict(self.default.stats(), profiles=len(self.services), registry=registry.stats(),
+                    watcher=watcher.stats())
+
+def split_profile(target):
+    # "/u/<slug>/chat?q=..." -> ("<slug>", "/chat"); otherwise the slug comes from ?profile=
+    parts = urlsplit(target)
+    path = parts.path.rstrip("/") or "/"
+    if path.startswith("/u/"):
+        slug, _, rest = path[3:].partition("/")
+        return slug, "/" + rest
+    return parse_qs(parts.query).get("profile", [""])[0], path
+
+# ---------------- minimal HTTP/1.1 front end (stdlib only) ----------------
+def http_response(status, payload, content_type="application/json; charset=utf-8", close=False):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    connection = "Connection: close\r\n" if close else ""
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n{connection}"
+            "Access-Control-Allow-Origin: *\r\nAccess-Control-Allow-Headers: Content-Type\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\nCache-Control: no-store\r\n\r\n")
+    return head.encode("latin-1") + body
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY_BYTES:
+        return method.upper(), target, headers, None    # not read: the caller refuses it and drops the connection
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+def request_question(method, target, body):
+    # ValueError for a body that isn't JSON, or isn't an object with a string "q"
+    if method == "POST":
+        data = json.loads(body or b"{}")
+        q = (data.get("q") if isinstance(data, dict) else None) or ""
+        if not isinstance(data, dict) or not isinstance(q, str):
+            raise ValueError("expected a JSON object with a string 'q'")
+        return q.strip()
+    return (parse_qs(urlsplit(target).query).get("q", [""])[0]).strip()
+
+def sse_event(data, event=None):
+    head = f"event: {event}\n" if event else ""
+    return (head + "data: " + json.dumps(data, ensure_ascii=False) + "\n\n").encode("utf-8")
+
+async def stream_sse(service, question, writer):
+    writer.write(("HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                  "Cache-Control: no-store\r\nConnection: close\r\nAccess-Control-Allow-Origin: *\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    stream = service.stream(question)
+    try:
+        async for chunk in stream:
+            writer.write(sse_event({"t": chunk}))
+            # drain() raises once the browser has closed the EventSource, which ends the generator early
+            await writer.drain()
+        writer.write(sse_event({}, event="done"))
+        await writer.drain()
+    finally:
+        await stream.aclose()
+
+async def stream_content(tenant, state, writer):
+    # the watcher thread hands deltas to this connection's queue through the event loop
+    loop = asyncio.get_running_loop()
+    deltas = asyncio.Queue()
+    listener = lambda delta: loop.call_soon_threadsafe(deltas.put_nowait, delta)
+    current, missed = await loop.run_in_executor(None, watcher.subscribe, tenant, listener, state)
+    try:
+        writer.write(("HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                      "Cache-Control: no-store\r\nConnection: close\r\nAccess-Control-Allow-Origin: *\r\n\r\n").encode("latin-1"))
+        if missed is None:
+            writer.write(sse_event({"state": current}, event="stale"))
+            await writer.drain()
+            return
+        for delta in missed:
+            writer.write(f"event: content\ndata: {delta['json']}\n\n".encode("utf-8"))
+        await writer.drain()
+        while True:
+            try:
+                delta = await asyncio.wait_for(deltas.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                writer.write(b": keepalive\n\n")
+            else:
+                # serialised once by the watcher, written as-is to every connection
+                writer.write(f"event: content\ndata: {delta['json']}\n\n".encode("utf-8"))
+            await writer.drain()
+    finally:
+        watcher.unsubscribe(tenant, listener)
+
+def search_posts(index, query):
+    index.refresh()
+    return index.search(query)
+
+async def route(services, method, target, body):
+    slug, path = split_profile(target)
+    if method == "OPTIONS":
+        return http_response("204 No Content", b"")
+    if path == "/health":
+        return http_response("200 OK", {"ok": True})
+    if path == "/stats":
+        return http_response("200 OK", services.stats())
+    tenant, service = services.get(slug)
+    if tenant is None:
+        return http_response("404 Not Found", {"error": "unknown profile"})
+    if path == "/search" and method == "GET":
+        q = request_question(method, target, body)
+        if not q:
+            return http_response("400 Bad Request", {"error": "missing query 'q'"})
+        # the rescan reads files and the search scores postings (both under the index lock), so they stay off the event loop
+        hits = await asyncio.get_running_loop().run_in_executor(None, search_posts, tenant.index, q[:MAX_QUESTION_CHARS])
+        registry.touch(tenant)
+        return http_response("200 OK", {"results": [{k: h[k] for k in ("slug", "title", "date", "score", "snippet")}
+                                                    for h in hits]})
+    if path == "/chat" and method in ("GET", "POST"):
+        try:
+            q = request_question(method, target, body)
+        except ValueError:
+            return http_response("400 Bad Request", {"error": "expected a JSON object with a string 'q'"})
+        if not q:
+            return http_response("400 Bad Request", {"error": "missing question 'q'"})
+        answer = await service.ask(q[:MAX_QUESTION_CHARS])
+        registry.touch(tenant)
+        return http_response("200 OK", {"answer": answer})
+    return http_response("404 Not Found", {"error": "not found"})
+
+def make_handler(services):
+    async def handle(reader, writer):
+        try:
+            while True:
+                req = await read_request(reader)
+                if req is None:
+                    break
+                method, target, headers, body = req
+                if body is None:
+                    writer.write(http_response("413 Payload Too Large",
+                                               {"error": f"request body over {MAX_BODY_BYTES} bytes"}, close=True))
+                    await writer.drain()
+                    break
+                slug, path = split_profile(target)
+                if method == "GET" and path == "/chat/stream":
+                    tenant, service = services.get(slug)
+                    q = request_question(method, target, body)
+                    if q and tenant is not None:
+                        await stream_sse(service, q[:MAX_QUESTION_CHARS], writer)
+                        registry.touch(tenant)
+                        break
+                if method == "GET" and path == "/events":
+                    tenant, _ = services.get(slug)
+                    if tenant is not None:
+                        state = parse_qs(urlsplit(target).query).get("state", [""])[0]
+                        await stream_content(tenant, state, writer)
+                        break
+                writer.write(await route(services, method, target, body))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+async def serve(host, port, services):
+    server = await asyncio.start_server(make_handler(services), host, port)
+    print(f"chat API listening on http://{host}:{port}  (GET /chat?q=..., POST /chat, GET /chat/stream?q=..., GET /search?q=..., "
+          "GET /events, GET /stats; other profiles under /u/<slug>/...)")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the chat orb's answers over HTTP.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("--backend", default="local",
+                    help="'local', 'fake' (slow deterministic streaming stand-in) or module:callable taking a question string")
+    ap.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    ap.add_argument("--ttl", type=float, default=CACHE_TTL)
+    args = ap.parse_args(argv)
+    service = ChatService(load_backend(args.backend), LRUCache(args.cache_size, args.ttl))
+    services = TenantServices(service, args.cache_size, args.ttl)
+    try:
+        asyncio.run(serve(args.host, args.port, services))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
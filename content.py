@@ -0,0 +1,226 @@
+# content.py
+# Content loading for the site: gallery scan, markdown blog posts and the HTML fragments built from them.
+# Kept out of app.py because Streamlit re-executes the main script on every rerun, while imported
+# modules (and the caches in content_cache.py) stay loaded and are shared across sessions.
+
+import os
+import re
+import html
+import time
+import unicodedata
+from urllib.parse import quote
+
+from instrument import timed, timed_fn
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+GALLERY_DIR = os.path.join(BASE_DIR, "gallery")
+POSTS_DIR = os.path.join(BASE_DIR, "blog_posts")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")  # generated sidecars (indexes, derivatives); safe to delete
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+# ---------------- Utility: read gallery & blog posts ----------------
+@timed_fn("scan:gallery")
+def get_gallery_images(gallery_dir=GALLERY_DIR):
+    if not os.path.exists(gallery_dir):
+        return []
+    files = sorted(f for f in os.listdir(gallery_dir) if f.lower().endswith(IMAGE_EXTS))
+    # return relative paths so Streamlit serves them
+    rel = os.path.relpath(gallery_dir, BASE_DIR)
+    return [os.path.join(rel, f) for f in files]
+
+def parse_front_matter(txt):
+    meta = {}
+    body = txt
+    m = re.match(r'---\n(.*?)\n---', txt, re.DOTALL)
+    if m:
+        meta_block = m.group(1)
+        for line in meta_block.splitlines():
+            if ':' in line:
+                k,v = line.split(':',1)
+                meta[k.strip()] = v.strip()
+        body = txt[m.end():].strip()
+    return meta, body
+
+def parse_tags(value):
+    # "tags: travel, Himachal Trips" or "tags: [travel, himachal-trips]" -> ["travel", "himachal-trips"]
+    # letters, marks and digits are kept (any script); everything else becomes a single "-"
+    tags = []
+    for raw in (value or "").strip().strip("[]").split(","):
+        kept = "".join(c if unicodedata.category(c)[0] in "LMN" else "-" for c in raw.strip().lower())
+        tag = re.sub(r'-+', '-', kept).strip('-')
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def render_markdown(body):
+    # imported on first use: markdown takes ~20ms to import and most reruns never render a post body
+    from markdown import markdown
+    return markdown(body)
+
+@timed_fn("get_post_data")
+def get_post_data(slug, posts_dir=POSTS_DIR):
+    file_path = os.path.join(posts_dir, f"{slug}.md")
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8") as fh:
+        txt = fh.read()
+    meta, body = parse_front_matter(txt)
+    with timed("markdown"):
+        body_html = render_markdown(body)
+    return {
+        "slug": slug,
+        "title": meta.get("title", slug.replace('-', ' ').title()),
+        "date": meta.get("date", ""),
+        "author": meta.get("author", ""),
+        "summary": meta.get("summary", ""),
+        "tags": parse_tags(meta.get("tags", "")),
+        "html": body_html
+    }
+
+def get_all_posts(posts_dir=POSTS_DIR):
+    if not os.path.exists(posts_dir):
+        return []
+    with timed("scan:posts"):
+        mds = sorted(f for f in os.listdir(posts_dir) if f.endswith(".md"))
+    posts = []
+    for m in mds:
+        p = get_post_data(m[:-3], posts_dir)
+        if p:
+            posts.append(p)
+    return posts
+
+# ---------------- Build HTML fragments for gallery & posts ----------------
+def same_url(path):
+    return path
+
+def build_gallery_img(src, rec=None, sizes="", url=same_url):
+    alt = os.path.basename(src)
+    if not rec:
+        return f'<div class="g-item" data-src="{src}"><img src="{url(src)}" alt="{alt}" loading="lazy" data-full="{url(src)}"/></div>\n'
+    # responsive derivatives (see gallery_derivatives.py); the original is only loaded by the lightbox
+    fallback = rec["variants"].get("jpeg") or rec["variants"]["png"]
+    fallback_type = "image/jpeg" if "jpeg" in rec["variants"] else "image/png"
+    webp = ", ".join(f"{url(path)} {w}w" for w, path in rec["variants"]["webp"])
+    plain = ", ".join(f"{url(path)} {w}w" for w, path in fallback)
+    return (f'<div class="g-item" data-src="{src}"><picture>'
+            f'<source type="image/webp" srcset="{webp}" sizes="{sizes}"/>'
+            f'<source type="{fallback_type}" srcset="{plain}" sizes="{sizes}"/>'
+            f'<img src="{url(fallback[0][1])}" width="{rec["width"]}" height="{rec["height"]}" alt="{alt}" '
+            f'loading="lazy" decoding="async" data-full="{url(src)}"/>'
+            f'</picture></div>\n')
+
+def build_gallery_html(gallery_imgs, derivatives=None, sizes="", url=same_url):
+    if not gallery_imgs:
+        return '<div class="g-empty">No images found in <code>gallery/</code></div>'
+    derivatives = derivatives or {}
+    return "".join(build_gallery_img(src, derivatives.get(src), sizes, url) for src in gallery_imgs)
+
+def query_post_href(slug):
+    return f"?post={quote(slug)}"
+
+def query_page_href(number):
+    return f"?page={number}"
+
+def query_tag_href(tag, number=1):
+    return f"?tag={quote(tag)}" + (f"&page={number}" if number > 1 else "")
+
+def build_tags_html(tags, tag_href=query_tag_href):
+    if not tags:
+        return ""
+    links = "".join(f'<a class="tag" href="{tag_href(t)}" target="_top">#{html.escape(t)}</a>' for t in tags)
+    return f'<div class="post-tags">{links}</div>'
+
+def build_post_html(p, back_href=None, tag_href=query_tag_href):
+    back = f'<a class="post-back" href="{back_href}" target="_top">← All posts</a>' if back_href else ""
+    return f'''
+        <article class="post" data-post="{p["slug"]}">
+          {back}
+          <h4 class="post-title">{p["title"]}</h4>
+          <div class="post-date">{p.get("date","")}</div>
+          {build_tags_html(p.get("tags"), tag_href)}
+          <div class="post-body">{p["html"]}</div>
+        </article>
+        '''
+
+def build_post_summary_html(p, post_href=query_post_href, tag_href=query_tag_href):
+    # links target the top window: the components iframe inherits the app URL, so ?post= reaches Streamlit
+    return f'''
+        <article class="post" data-slug="{p["slug"]}">
+          <h4 class="post-title"><a href="{post_href(p["slug"])}" target="_top">{p["title"]}</a></h4>
+          <div class="post-date">{p.get("date","")}</div>
+          {build_tags_html(p.get("tags"), tag_href)}
+          <div class="post-summary">{p.get("summary","")}</div>
+        </article>
+        '''
+
+def build_related_html(entries, post_href=query_post_href):
+    # precomputed by post_related.py; nothing is shown for a post without similar ones
+    if not entries:
+        return ""
+    items = "".join(f'<li><a href="{post_href(e["slug"])}" target="_top">{e["title"]}</a></li>' for e in entries)
+    return f'<div class="post-related"><h4>Related posts</h4><ul>{items}</ul></div>'
+
+def build_search_form_html(query="", hidden=None):
+    # action="?" resolves against the app URL (not about:srcdoc), so the GET lands on Streamlit as ?search=
+    # hidden: extra query parameters to carry along (e.g. {"profile": slug})
+    fields = "".join(f'<input type="hidden" name="{html.escape(k)}" value="{html.escape(v)}"/>'
+                     for k, v in (hidden or {}).items())
+    return (f'<form class="post-search" action="?" method="get" target="_top" role="search">{fields}'
+            f'<input type="search" name="search" value="{html.escape(query)}" placeholder="Search posts…" '
+            f'aria-label="Search posts"/></form>')
+
+def build_search_hit_html(hit, post_href=query_post_href):
+    # snippet is already escaped HTML with <mark> highlights (post_search.make_snippet)
+    return f'''
+        <article class="post">
+          <h4 class="post-title"><a href="{post_href(hit["slug"])}" target="_top">{hit["title"]}</a></h4>
+          <div class="post-date">{hit.get("date","")}</div>
+          <div class="post-summary">{hit["snippet"]}</div>
+        </article>
+        '''
+
+def build_search_results_html(query, hits, post_href=query_post_href, back_href="?"):
+    back = f'<a class="post-back" href="{back_href}" target="_top">← All posts</a>'
+    if not hits:
+        return f'{back}<div class="g-empty">No posts match “{html.escape(query)}”.</div>'
+    return back + "".join(build_search_hit_html(h, post_href) for h in hits)
+
+def build_pager_html(number, pages, page_href=query_page_href):
+    if pages <= 1:
+        return ""
+    prev = f'<a href="{page_href(number - 1)}" target="_top">← Newer</a>' if number > 1 else "<span></span>"
+    nxt = f'<a href="{page_href(number + 1)}" target="_top">Older →</a>' if number < pages else "<span></span>"
+    return f'<div class="post-pager" data-page="{number}">{prev}<span>Page {number} of {pages}</span>{nxt}</div>'
+
+def query_writings_href(number):
+    return f"?wpage={number}"
+
+def build_writing_html(w):
+    when = time.strftime("%B %d, %Y", time.localtime(w["created"]))
+    text = html.escape(w["text"]).replace("\n", "<br/>")
+    return f'<div class="writing"><div class="writing-text">{text}</div><div class="post-date">{when}</div></div>\n'
+
+def build_writings_html(entries, number=1, pages=1, page_href=query_writings_href):
+    if not entries:
+        return "No anonymous writings yet."
+    return "".join(build_writing_html(w) for w in entries) + build_pager_html(number, pages, page_href)
+
+def build_posts_html(posts):
+    if not posts:
+        return '<div class="g-empty">No blog posts found (add .md files to blog_posts/)</div>'
+    return "".join(build_post_html(p) for p in posts)
+
+def build_posts_page_html(entries, number, pages, post_href=query_post_href, page_href=query_page_href,
+                          tag_href=query_tag_href):
+    if not entries:
+        return build_posts_html([])
+    return ("".join(build_post_summary_html(p, post_href, tag_href) for p in entries)
+            + build_pager_html(number, pages, page_href))
+
+def build_tag_page_html(tag, entries, number, pages, post_href=query_post_href, tag_href=query_tag_href, back_href="?"):
+    back = f'<a class="post-back" href="{back_href}" target="_top">← All posts</a>'
+    head = f'{back}<h4 class="post-tag-head">Posts tagged #{html.escape(tag)}</h4>'
+    if not entries:
+        return f'{head}<div class="g-empty">No posts are tagged #{html.escape(tag)}.</div>'
+    return (head + "".join(build_post_summary_html(p, post_href, tag_href) for p in entries)
+            + build_pager_html(number, pages, lambda n: tag_href(tag, n)))
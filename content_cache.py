@@ -0,0 +1,156 @@
+# content_cache.py
+# In-memory content layer shared by every Streamlit session in the process.
+# - Parsed posts are cached per file and re-rendered only when that file's (mtime, size) changes
+# - The gallery manifest is re-listed only when the gallery directory itself changes
+# - Fully assembled pages are cached by the content versions they were built from, least recently used evicted first;
+#   search results get their own smaller pool so one-off queries can't push the home page out
+# - A page is built outside the lock (other sessions keep reading); concurrent misses on one key wait for a single build
+# - Hit/miss counters per layer (see ContentCache.stats)
+
+import os
+import threading
+from collections import OrderedDict
+
+from content import GALLERY_DIR, POSTS_DIR, get_gallery_images, get_post_data
+from instrument import timed
+
+MAX_PAGES = 8
+MAX_SEARCH_PAGES = 4
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class ContentCache:
+    def __init__(self, posts_dir=POSTS_DIR, gallery_dir=GALLERY_DIR):
+        self.posts_dir = posts_dir
+        self.gallery_dir = gallery_dir
+        self.lock = threading.RLock()
+        self.post_entries = {}      # slug -> (signature, post dict)
+        self.posts_list = []
+        self.posts_version = 0      # bumped whenever any post is added, changed or removed
+        self.gallery_sig = None
+        self.gallery_imgs = []
+        self.gallery_version = 0
+        self.pages = OrderedDict()  # key -> assembled html, least recently used first
+        self.search_pages = OrderedDict()   # same, for search result views
+        self.building = {}          # page key -> Event set once the session building it is done
+        self.pages_version = 0      # bumped whenever a page is stored (and possibly another evicted)
+        self.counters = {k: {"hits": 0, "misses": 0} for k in ("posts", "gallery", "page")}
+
+    def _count(self, layer, hit, n=1):
+        self.counters[layer]["hits" if hit else "misses"] += n
+
+    # ---------------- posts ----------------
+    def get_all_posts(self):
+        with self.lock:
+            with timed("scan:posts"):
+                if not os.path.exists(self.posts_dir):
+                    names = []
+                else:
+                    names = sorted(f for f in os.listdir(self.posts_dir) if f.endswith(".md"))
+            seen = set()
+            changed = False
+            for name in names:
+                slug = name[:-3]
+                seen.add(slug)
+                sig = file_signature(os.path.join(self.posts_dir, name))
+                entry = self.post_entries.get(slug)
+                if entry and entry[0] == sig:
+                    self._count("posts", True)
+                    continue
+                self._count("posts", False)
+                self.post_entries[slug] = (sig, get_post_data(slug, self.posts_dir))
+                changed = True
+            for slug in [s for s in self.post_entries if s not in seen]:
+                del self.post_entries[slug]
+                changed = True
+            if changed:
+                self.posts_list = [self.post_entries[n[:-3]][1] for n in names if self.post_entries[n[:-3]][1]]
+                self.posts_version += 1
+            return list(self.posts_list)
+
+    def get_post(self, slug):
+        # single rendered post, for lazy body rendering (see post_index.py)
+        with self.lock:
+            sig = file_signature(os.path.join(self.posts_dir, f"{slug}.md"))
+            entry = self.post_entries.get(slug)
+            if sig is not None and entry and entry[0] == sig:
+                self._count("posts", True)
+                return entry[1]
+            self._count("posts", False)
+            if sig is None:
+                self.post_entries.pop(slug, None)
+                return None
+            post = get_post_data(slug, self.posts_dir)
+            self.post_entries[slug] = (sig, post)
+            return post
+
+    # ---------------- gallery ----------------
+    def get_gallery_images(self):
+        with self.lock:
+            # adding/removing/renaming files updates the directory mtime, so one stat covers the listing
+            sig = file_signature(self.gallery_dir)
+            if sig is not None and sig == self.gallery_sig:
+                self._count("gallery", True)
+                return list(self.gallery_imgs)
+            self._count("gallery", False)
+            imgs = get_gallery_images(self.gallery_dir)
+            if imgs != self.gallery_imgs:
+                self.gallery_version += 1
+            self.gallery_sig = sig
+            self.gallery_imgs = imgs
+            return list(imgs)
+
+    # ---------------- assembled pages ----------------
+    def get_page(self, key, build, search=False):
+        pages, limit = (self.search_pages, MAX_SEARCH_PAGES) if search else (self.pages, MAX_PAGES)
+        while True:
+            with self.lock:
+                html = pages.get(key)
+                if html is not None:
+                    pages.move_to_end(key)
+                    self._count("page", True)
+                    return html
+                done = self.building.get(key)
+                if done is None:
+                    done = self.building[key] = threading.Event()
+                    self._count("page", False)
+                    break
+            # another session is building this page; take its result (or the build, if that one failed)
+            done.wait()
+        try:
+            html = build()
+            with self.lock:
+                pages[key] = html
+                self.pages_version += 1
+                while len(pages) > limit:
+                    pages.popitem(last=False)
+            return html
+        finally:
+            with self.lock:
+                self.building.pop(key, None)
+            done.set()
+
+    def versions(self):
+        return (self.posts_version, self.gallery_version)
+
+    def stats(self):
+        with self.lock:
+            out = {}
+            for layer, c in self.counters.items():
+                total = c["hits"] + c["misses"]
+                out[layer] = dict(c, hit_rate=(c["hits"] / total) if total else 0.0)
+            out["posts_cached"] = len(self.post_entries)
+            out["pages_cached"] = len(self.pages) + len(self.search_pages)
+            return out
+
+    def clear(self):
+        with self.lock:
+            self.__init__(self.posts_dir, self.gallery_dir)
+
+# shared instance: module state survives reruns, so every session reads from the same cache
+cache = ContentCache()
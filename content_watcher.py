@@ -0,0 +1,210 @@
+# content_watcher.py
+# One background thread watches gallery/ and blog_posts/ of every site (profile) being viewed, instead of each
+# session rescanning them on its reruns.
+# - Polls every POLL_INTERVAL: one stat of the gallery directory and one scandir of the posts directory per site
+#   (stdlib only; inotify is Linux-only and would need a third-party binding)
+# - Keeps each site's gallery listing and post index current, so app.py no longer scans on its own
+# - A change becomes one small delta: added/removed gallery items and new/changed/removed post summaries as HTML
+#   fragments (rendered once, serialised once) plus the first page's order. Subscribers get every delta;
+#   chat_server.py streams them to open pages over SSE (GET /events), where the page script patches the DOM
+# - Deltas are chained by a content state token (content_state) that the page embeds, so a page rendered a moment
+#   earlier, or by another process, resumes from the delta that follows its own state; a state this process hasn't
+#   seen yet (a newer page from another process, or a change inside the poll interval) triggers a poll right away
+# - Sites nobody viewed or subscribed to for IDLE_TIMEOUT are dropped; the thread exits when none are left
+
+import sys
+import json
+import time
+import hashlib
+import threading
+import traceback
+from collections import deque
+from urllib.parse import quote
+
+from content import build_gallery_img, build_post_html, build_post_summary_html
+from gallery_derivatives import SIZES, store as derivative_store
+from instrument import record
+from post_index import PER_PAGE
+from profiles import profile_query
+
+POLL_INTERVAL = 1.0         # seconds between scans
+BACKLOG = 64                # deltas kept per site for pages that connect late or reconnect
+IDLE_TIMEOUT = 300.0        # seconds a site stays watched without views or subscribers
+MAX_SUMMARIES = 100         # changed post summaries per delta (bulk imports only patch the first page)
+MAX_FULL_POSTS = 8          # edited posts re-rendered in full per delta, for pages showing that post
+
+def content_state(gallery_imgs, posts):
+    """Token for a site's content: gallery listing plus every post's (mtime, size); the same in every process."""
+    data = json.dumps([gallery_imgs, sorted(posts.items())], separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+def snapshot(tenant):
+    imgs = tenant.content.get_gallery_images()
+    tenant.index.refresh(force=True)
+    with tenant.index.lock:
+        posts = {slug: tuple(e["sig"]) for slug, e in tenant.index.entries.items()}
+        first_page = tenant.index.order[:PER_PAGE]
+    return imgs, posts, first_page
+
+class WatchedSite:
+    def __init__(self, tenant):
+        self.tenant = tenant
+        self.gallery, self.posts, self.first_page = snapshot(tenant)
+        self.state = content_state(self.gallery, self.posts)
+        self.backlog = deque(maxlen=BACKLOG)    # deltas, oldest first
+        self.listeners = []
+        self.last_used = time.monotonic()
+        self.poll_lock = threading.Lock()   # the watcher thread and subscribe() may both poll this site
+
+    def make_delta(self, imgs, posts, first_page, state):
+        tenant = self.tenant
+        link_query = profile_query(tenant)
+        post_href = lambda slug: f"?{link_query}post={quote(slug)}"
+        tag_href = lambda tag, n=1: f"?{link_query}tag={quote(tag)}" + (f"&page={n}" if n > 1 else "")
+        old_imgs, new_imgs = set(self.gallery), set(imgs)
+        added = [(i, src) for i, src in enumerate(imgs) if src not in old_imgs]
+        ready, _ = derivative_store.lookup([src for _, src in added])
+        gallery = {
+            # "after": the item to insert behind (None = first), so clients keep the listing's order
+            "added": [{"src": src, "after": imgs[i - 1] if i else None,
+                       "html": build_gallery_img(src, ready.get(src), SIZES)} for i, src in added],
+            "removed": [src for src in self.gallery if src not in new_imgs],
+        }
+        changed = [slug for slug, sig in posts.items() if self.posts.get(slug) != sig]
+        # posts that moved onto the first page are sent too, so page-1 readers can fill the gap
+        wanted = changed[:MAX_SUMMARIES] + [s for s in first_page if s in changed or s not in self.first_page]
+        summaries = {}
+        for slug in wanted:
+            entry = tenant.index.get(slug)
+            if entry:
+                summaries[slug] = build_post_summary_html(entry, post_href, tag_href)
+        full = {}
+        for slug in [s for s in changed if s in self.posts][:MAX_FULL_POSTS]:
+            post = tenant.content.get_post(slug)
+            if post:
+                full[slug] = build_post_html(post, "?" + link_query.rstrip("&"), tag_href)
+        posts_delta = {"summaries": summaries, "full": full, "first_page": first_page,
+                       "removed": [slug for slug in self.posts if slug not in posts]}
+        payload = {"prev": self.state, "state": state, "gallery": gallery, "posts": posts_delta}
+        return {"prev": self.state, "state": state, "json": json.dumps(payload, ensure_ascii=False)}
+
+    def since(self, state):
+        """Deltas that bring a page at `state` up to date; None when that state is unknown (too old)."""
+        if not state or state == self.state:
+            return []
+        for i in range(len(self.backlog) - 1, -1, -1):
+            if self.backlog[i]["prev"] == state:
+                return list(self.backlog)[i:]
+        return None
+
+class ContentWatcher:
+    def __init__(self, interval=POLL_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.lock = threading.RLock()
+        self.sites = {}     # slug -> WatchedSite
+        self.thread = None
+        self.polls = self.deltas = 0
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="content-watcher", daemon=True)
+                self.thread.start()
+
+    def _site(self, tenant):
+        with self.lock:
+            site = self.sites.get(tenant.slug)
+            if site is not None and site.tenant is tenant:
+                site.last_used = time.monotonic()
+                self._start()   # restarts the thread if something killed it
+                return site
+        site = WatchedSite(tenant)     # first scan runs in the caller's thread, outside the lock
+        with self.lock:
+            known = self.sites.get(tenant.slug)
+            if known is not None and known.tenant is tenant:
+                site = known
+            else:
+                self.sites[tenant.slug] = site
+            site.last_used = time.monotonic()
+            self._start()
+            return site
+
+    def watch(self, tenant):
+        """Make sure tenant's folders are being watched (the first call scans them now); returns the content state."""
+        return self._site(tenant).state
+
+    def subscribe(self, tenant, listener, state=None):
+        """Call listener(delta) from the watcher thread on every change to tenant's content.
+
+        Returns (current state, deltas a page at `state` missed, or None when `state` is too old to catch up).
+        """
+        site = self._site(tenant)
+        with self.lock:
+            known = site.since(state) is not None
+        if not known:
+            try:
+                self._poll(site)    # maybe the page is newer than our last poll, not older
+            except OSError:
+                pass
+        with self.lock:
+            site.listeners.append(listener)
+            return site.state, site.since(state)
+
+    def unsubscribe(self, tenant, listener):
+        with self.lock:
+            site = self.sites.get(tenant.slug)
+            if site is not None and listener in site.listeners:
+                site.listeners.remove(listener)
+                site.last_used = time.monotonic()
+
+    # ---------------- watcher thread ----------------
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self.lock:
+                for slug, site in list(self.sites.items()):
+                    if site.tenant.closed or (not site.listeners and now - site.last_used > self.idle_timeout):
+                        del self.sites[slug]
+                if not self.sites:
+                    self.thread = None
+                    return
+                sites = list(self.sites.values())
+            started = time.perf_counter()
+            for site in sites:
+                try:
+                    self._poll(site)
+                except OSError:
+                    pass    # the folder is being replaced; try again next round
+                except Exception:
+                    # e.g. a post markdown can't render: report it, keep watching this site and the others
+                    traceback.print_exc(file=sys.stderr)
+            self.polls += 1
+            record("watch:poll", time.perf_counter() - started)
+
+    def _poll(self, site):
+        with site.poll_lock:
+            imgs, posts, first_page = snapshot(site.tenant)
+            state = content_state(imgs, posts)
+            if state == site.state:
+                return
+            delta = site.make_delta(imgs, posts, first_page, state)
+            with self.lock:
+                site.gallery, site.posts, site.first_page, site.state = imgs, posts, first_page, state
+                site.backlog.append(delta)
+                listeners = list(site.listeners)
+                self.deltas += 1
+        for listener in listeners:
+            try:
+                listener(delta)
+            except Exception:
+                self.unsubscribe(site.tenant, listener)    # e.g. its event loop has shut down
+
+    def stats(self):
+        with self.lock:
+            return {"sites": len(self.sites), "subscribers": sum(len(s.listeners) for s in self.sites.values()),
+                    "polls": self.polls, "deltas": self.deltas}
+
+# shared instance, like content_cache.cache: one thread per process, whatever the number of sessions
+watcher = ContentWatcher()
@@ -0,0 +1,49 @@
+# facts.py
+# Q&A content for the chat orb: the canonical ARYAN_FACTS table plus the keyword FAQ.
+# Shared by the page (injected as __FACTS__) and the Python answer engine (answer_engine.py).
+
+ARYAN_FACTS = {
+    "who is aryan": "Aryan is that guy who turns everyday moments into funny stories without even trying.",
+    "what is aryan currently studying": "Pursuing a Bachelor's degree. 🎓",
+    "what makes aryan smile": "Random jokes, good coffee, and accidental life plot twists.",
+    "what’s aryan’s comfort drink": "Coffee ☕. Without it, he’s basically on airplane mode.",
+    "does aryan like travelling": "Yes! Especially when the trip ends with coffee and mountain views.",
+    "how does aryan handle pressure": "With calmness… and maybe two extra cups of coffee.",
+    "what is aryan good at": "Turning simple moments into mini stories and making people laugh randomly.",
+    "what’s aryan’s vibe": "Chill, creative, and always up for a good conversation.",
+    "is aryan an introvert or extrovert": "Somewhere in between—depends on the energy, the weather, and the wifi.",
+    "what motivates aryan": "New ideas, good music, and that one perfect cup of coffee.",
+    "how does aryan face challenges": "With confidence… and sarcasm when required.",
+    "what’s something aryan can't live without": "Coffee. None 😅.",
+    "what makes aryan unique": "His ability to make people laugh even when he’s not trying.",
+    "what’s aryan’s favorite weather": "Cold breeze + warm coffee = perfection.",
+    "how does aryan relax": "Storytelling, music, and wandering thoughts.",
+    "what is aryan passionate about": "Tech, creativity, and turning ideas into reality.",
+    "what is aryan learning right now": "New tech skills… one coffee at a time.",
+    "what type of person is aryan": "Calm, humorous, and secretly a deep thinker.",
+    "what’s aryan’s favourite thing to do": "Observe life and turn it into funny, relatable stories.",
+    "what does aryan dream about": "A life full of learning, creativity, and a never-ending coffee supply."
+}
+
+# Keyword FAQ carried over from the React chatbot (empty1/src/Chatbot.tsx), including its fallback topics
+FAQS = [
+    {"q": "Where were you born?", "a": "Aryan was born in Punjab — land of lassi and bhangra. 🥳", "keywords": ["born", "birth", "punjab"]},
+    {"q": "Where do you live now?", "a": "In the beautiful mountains of Himachal Pradesh 🌄.", "keywords": ["live", "location", "himachal", "mountain"]},
+    {"q": "What do you love the most?", "a": "Coffee ☕. Without it, Aryan is basically on airplane mode.", "keywords": ["love", "most", "favorite", "coffee"]},
+    {"q": "How many girlfriends do you have?", "a": "None 😅. But coffee keeps him warm, so no complaints.", "keywords": ["girlfriend", "relationship", "love life"]},
+    {"q": "Are you a writer?", "a": "Yup! Aryan writes stories, thoughts, and maybe a few secret rants too. ✍️", "keywords": ["writer", "write", "stories", "author"]},
+    {"q": "What’s your relationship status?", "a": "Married to coffee. ☕❤️", "keywords": ["relationship", "status", "married"]},
+    {"q": "What’s your hobby?", "a": "Writing, exploring ideas, and overthinking like a pro.", "keywords": ["hobby", "hobbies", "interest"]},
+    {"q": "Who are you?", "a": "I’m Aryan’s chatbot, his virtual twin with more sarcasm. 😎", "keywords": ["who", "you", "chatbot", "virtual"]},
+    {"q": "What’s your dream?", "a": "To write something legendary and maybe own a coffee shop in the mountains one day. 🌲☕", "keywords": ["dream", "goal", "ambition"]},
+    {"q": "Do you like traveling?", "a": "Yes! Especially when the trip ends with coffee and mountain views.", "keywords": ["travel", "trip", "vacation"]},
+    {"q": "What’s your favorite drink?", "a": "Need you even ask? Coffee. Always coffee.", "keywords": ["drink", "favorite", "coffee"]},
+    {"q": "What kind of person is Aryan?", "a": "Chill, creative, funny — and slightly addicted to caffeine.", "keywords": ["person", "character", "personality"]},
+    {"q": "Do you party a lot?", "a": "Not really. His idea of a party = coffee + notebook + peace ✌️.", "keywords": ["party", "fun", "celebrate"]},
+    {"q": "Any secret talent?", "a": "Aryan can turn everyday life into stories. And also make people laugh randomly.", "keywords": ["talent", "secret", "skill"]},
+    {"q": "What motivates you?", "a": "Coffee first… then dreams, goals, and the hope of fewer Monday mornings. 😂", "keywords": ["motivate", "motivation", "inspire"]},
+    {"q": "What's your name?", "a": "Aryan Sharma — that guy who turns everyday moments into funny stories.", "keywords": ["name"]},
+    {"q": "What are you studying?", "a": "Pursuing a Bachelor's degree. 🎓", "keywords": ["degree", "study", "studying"]},
+    {"q": "How can I contact Aryan?", "a": "You can reach Aryan at aryanxsharma26@gmail.com.", "keywords": ["email", "contact", "mail"]},
+    {"q": "What is Aryan passionate about?", "a": "Coding, learning, and developing new things.", "keywords": ["passion", "passionate"]},
+]
@@ -0,0 +1,247 @@
+# gallery_derivatives.py
+# Responsive derivatives for gallery photos: resized WebP + JPEG/PNG variants in a few widths.
+# - Derivatives live in .cache/derivatives/, named by a hash of the source bytes (so they never go stale)
+# - A small manifest remembers each source's (mtime, size) -> hash, so unchanged photos aren't even re-hashed;
+#   it is re-read when another process (gallery_ingest.py) rewrites it, and merged rather than overwritten on save
+# - Pillow is optional: without it the gallery falls back to the original files. It is imported on first use,
+#   so reruns (and cold starts) that only read existing records never pay for it
+# - lookup() never renders; warm() queues missing derivatives for one background thread, which keeps going
+#   until every queued photo is done (photos queued while it runs join its work)
+# - Rendering happens outside the store's lock (it is only held to read or install a record), so lookups from
+#   other sessions and the content watcher never wait for a decode
+# - Animated GIFs are left alone
+
+import os
+import json
+import hashlib
+import threading
+
+from content import BASE_DIR, CACHE_DIR
+
+DERIVATIVES_DIR = os.path.join(CACHE_DIR, "derivatives")
+MANIFEST_PATH = os.path.join(DERIVATIVES_DIR, "manifest.json")
+WIDTHS = (320, 640, 960)
+WEBP_QUALITY = 78
+JPEG_QUALITY = 82
+# gallery cells are half a ~560px card on desktop and half the viewport on small screens
+SIZES = "(max-width:900px) 50vw, 280px"
+
+Image = ImageOps = None
+_pillow_checked = False
+
+def have_pillow():
+    """Import Pillow on first use; False when it isn't installed."""
+    global Image, ImageOps, _pillow_checked
+    if not _pillow_checked:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:  # pragma: no cover - Pillow not installed
+            pass
+        _pillow_checked = True
+    return Image is not None
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def prepare_image(im):
+    if getattr(im, "is_animated", False):
+        return None
+    # phone photos are usually stored sideways with an EXIF orientation tag
+    return ImageOps.exif_transpose(im)
+
+def render_variants(im, digest, out_dir=DERIVATIVES_DIR, widths=WIDTHS):
+    os.makedirs(out_dir, exist_ok=True)
+    alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+    im = im.convert("RGBA" if alpha else "RGB")
+    fallback = "png" if alpha else "jpeg"
+    # never upscale or re-encode at full size: the original already is that variant
+    targets = [w for w in sorted(widths) if w < im.width] or [im.width]
+    variants = {"webp": [], fallback: []}
+    for w in targets:
+        h = max(1, round(im.height * w / im.width))
+        resized = im if w == im.width else im.resize((w, h), Image.LANCZOS)
+        for fmt in variants:
+            ext = "jpg" if fmt == "jpeg" else fmt
+            out = os.path.join(out_dir, f"{digest[:16]}-{w}.{ext}")
+            if not os.path.exists(out):
+                tmp = f"{out}.{os.getpid()}.tmp"
+                opts = {"quality": WEBP_QUALITY, "method": 4} if fmt == "webp" else \
+                       {"quality": JPEG_QUALITY, "optimize": True, "progressive": True} if fmt == "jpeg" else \
+                       {"optimize": True}
+                resized.save(tmp, fmt.upper(), **opts)
+                os.replace(tmp, out)
+            variants[fmt].append([w, os.path.relpath(out, BASE_DIR)])
+    return variants
+
+def dhash(im, size=8):
+    # 64-bit difference hash: robust to re-encoding/resizing, so near-duplicate uploads land within a few bits
+    small = im.convert("L").resize((size + 1, size), Image.LANCZOS)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = px[row * (size + 1) + col]
+            bits = (bits << 1) | (left > px[row * (size + 1) + col + 1])
+    return f"{bits:016x}"
+
+def make_record(src_path, sig, digest=None, out_dir=DERIVATIVES_DIR):
+    have_pillow()
+    digest = digest or file_hash(src_path)
+    with Image.open(src_path) as raw:
+        im = prepare_image(raw)
+        if im is None:
+            return None
+        return {"sig": list(sig), "hash": digest, "width": im.width, "height": im.height,
+                "phash": dhash(im), "variants": render_variants(im, digest, out_dir)}
+
+class DerivativeStore:
+    def __init__(self, out_dir=DERIVATIVES_DIR, manifest_path=MANIFEST_PATH):
+        self.out_dir = out_dir
+        self.manifest_path = manifest_path
+        self.lock = threading.RLock()
+        self.records = {}   # source path relative to BASE_DIR -> record ({"sig", "skip": True} = keep original)
+        self.dirty = set()  # rels installed here since the last save (they win over the file when merging)
+        self.version = 0    # bumped whenever a record is added or replaced (feeds page cache keys)
+        self.manifest_sig = None
+        self.warmer = None
+        self.pending = {}   # rels queued for the warmer (a dict as an ordered set)
+        self.refresh()
+
+    def _manifest_signature(self):
+        try:
+            st = os.stat(self.manifest_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self):
+        """Merge in records another process saved since we last read or wrote the manifest (one stat otherwise)."""
+        sig = self._manifest_signature()
+        with self.lock:
+            if sig is None or sig == self.manifest_sig:
+                return
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                    saved = json.load(fh)
+            except (OSError, ValueError):
+                return
+            self.manifest_sig = sig
+            changed = False
+            for rel, rec in saved.items():
+                if rel not in self.dirty and self.records.get(rel) != rec:
+                    self.records[rel] = rec
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def _save(self):
+        self.refresh()
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.records, fh)
+        os.replace(tmp, self.manifest_path)
+        self.manifest_sig = self._manifest_signature()
+        self.dirty.clear()
+
+    def is_current(self, rel, sig):
+        rec = self.records.get(rel)
+        return bool(rec) and rec["sig"] == list(sig) and ("phash" in rec or rec.get("skip"))
+
+    def put(self, rel, rec):
+        with self.lock:
+            self.records[rel] = rec
+            self.dirty.add(rel)
+            self.version += 1
+
+    def save(self):
+        with self.lock:
+            try:
+                self._save()
+            except OSError:
+                pass  # read-only deploys still get this run's derivatives
+
+    def get(self, rel, save=True):
+        if not have_pillow():
+            return None
+        path = os.path.join(BASE_DIR, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            if self.is_current(rel, sig):
+                rec = self.records[rel]
+                return None if rec.get("skip") else rec
+        try:
+            rec = make_record(path, sig, out_dir=self.out_dir)
+        except (OSError, ValueError):
+            rec = None
+        # unreadable/animated sources are remembered too, so they aren't retried every run
+        rec = rec or {"sig": list(sig), "skip": True}
+        with self.lock:
+            if self.is_current(rel, sig):
+                rec = self.records[rel]     # another thread finished the same photo first
+            else:
+                self.records[rel] = rec
+                self.dirty.add(rel)
+                self.version += 1
+                if save:
+                    self.save()
+        return None if rec.get("skip") else rec
+
+    def for_images(self, rels):
+        self.refresh()
+        with self.lock:
+            before = self.version
+        out = {rel: self.get(rel, save=False) for rel in rels}
+        with self.lock:
+            if self.version != before:
+                self.save()
+        return out
+
+    def lookup(self, rels):
+        """Return ({rel: record or None} for images already processed, [rels still to render]); never renders."""
+        if _pillow_checked and Image is None:
+            return {}, []
+        self.refresh()
+        ready, missing = {}, []
+        for rel in rels:
+            try:
+                st = os.stat(os.path.join(BASE_DIR, rel))
+            except OSError:
+                continue
+            with self.lock:
+                if self.is_current(rel, (st.st_mtime_ns, st.st_size)):
+                    rec = self.records[rel]
+                    ready[rel] = None if rec.get("skip") else rec
+                else:
+                    missing.append(rel)
+        return ready, missing
+
+    def warm(self, rels):
+        """Queue rels for the background warmer, starting it if needed; returns that thread."""
+        with self.lock:
+            self.pending.update(dict.fromkeys(rels))
+            if self.pending and (self.warmer is None or not self.warmer.is_alive()):
+                self.warmer = threading.Thread(target=self._warm_loop, name="derivatives-warm", daemon=True)
+                self.warmer.start()
+            return self.warmer
+
+    def _warm_loop(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.warmer = None
+                    return
+                rels = list(self.pending)
+                self.pending.clear()
+            self.for_images(rels)
+
+# shared instance (module state survives Streamlit reruns)
+store = DerivativeStore()
@@ -0,0 +1,154 @@
+# gallery_ingest.py
+# Batch ingest for large gallery imports, outside the Streamlit script thread.
+# - Scans gallery/ the same way the site does (content.get_gallery_images)
+# - Decode / EXIF-fix / resize / perceptual-hash runs in a process pool with a bounded number of images in flight
+# - Results stream back as they finish and are checkpointed into the derivative manifest,
+#   so an interrupted run resumes where it stopped (finished images are skipped by (mtime, size))
+# - Flags exact duplicates, near-duplicates (dHash distance) and re-uploads sharing a UUID-style name
+#
+# Usage:  python gallery_ingest.py [--workers N] [--gallery DIR] [--threshold BITS]
+
+import os
+import re
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from content import BASE_DIR, GALLERY_DIR, get_gallery_images
+from gallery_derivatives import have_pillow, make_record, store as default_store
+
+CHECKPOINT_EVERY = 25       # results between manifest saves
+IN_FLIGHT_PER_WORKER = 2    # bounds decoded images held in memory at once
+NEAR_DUP_BITS = 6           # max dHash Hamming distance treated as "same photo"
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+def process_one(rel, sig, out_dir):
+    # runs in a worker process; returns plain data only
+    try:
+        rec = make_record(os.path.join(BASE_DIR, rel), sig, out_dir=out_dir)
+        error = None
+    except (OSError, ValueError) as e:
+        rec, error = None, str(e)
+    return rel, rec or {"sig": list(sig), "skip": True}, error
+
+def pending_images(rels, store):
+    for rel in rels:
+        try:
+            st = os.stat(os.path.join(BASE_DIR, rel))
+        except OSError:
+            continue
+        sig = (st.st_mtime_ns, st.st_size)
+        if not store.is_current(rel, sig):
+            yield rel, sig
+
+def ingest(gallery_dir=GALLERY_DIR, workers=None, store=default_store):
+    """Process new/changed gallery images in parallel; yields (rel, record, error) as each one finishes."""
+    if not have_pillow():
+        raise RuntimeError("Pillow is required for gallery ingest (pip install Pillow)")
+    workers = workers or os.cpu_count() or 1
+    todo = pending_images(get_gallery_images(gallery_dir), store)
+    done_since_save = 0
+    # spawn: never fork a process that may be hosting Streamlit's threads
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        in_flight = set()
+        try:
+            while True:
+                while len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                    nxt = next(todo, None)
+                    if nxt is None:
+                        break
+                    in_flight.add(pool.submit(process_one, nxt[0], nxt[1], store.out_dir))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    rel, rec, error = fut.result()
+                    store.put(rel, rec)
+                    done_since_save += 1
+                    if done_since_save >= CHECKPOINT_EVERY:
+                        store.save()
+                        done_since_save = 0
+                    yield rel, rec, error
+        finally:
+            for fut in in_flight:
+                fut.cancel()
+            store.save()
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+def find_duplicates(records, threshold=NEAR_DUP_BITS):
+    """Return sorted (kind, rel_a, rel_b, distance) tuples for exact, near and same-UUID duplicates."""
+    flags = set()
+    hashed = {rel: r for rel, r in records.items() if r and not r.get("skip") and "phash" in r}
+    by_digest = {}
+    for rel, r in sorted(hashed.items()):
+        if r["hash"] in by_digest:
+            flags.add(("exact", by_digest[r["hash"]], rel, 0))
+        else:
+            by_digest[r["hash"]] = rel
+    # pigeonhole: hashes within `threshold` bits share at least one of threshold+1 bands exactly
+    bands = threshold + 1
+    width = 64 // bands
+    buckets = {}
+    for rel, r in sorted(hashed.items()):
+        h = int(r["phash"], 16)
+        for b in range(bands):
+            key = (b, (h >> (b * width)) & ((1 << width) - 1))
+            buckets.setdefault(key, []).append(rel)
+    seen = set()
+    for rels in buckets.values():
+        for i, a in enumerate(rels):
+            for b in rels[i + 1:]:
+                if (a, b) in seen:
+                    continue
+                seen.add((a, b))
+                d = hamming(hashed[a]["phash"], hashed[b]["phash"])
+                if d <= threshold and hashed[a]["hash"] != hashed[b]["hash"]:
+                    flags.add(("near", a, b, d))
+    by_uuid = {}
+    for rel in sorted(records):
+        m = UUID_RE.search(os.path.basename(rel))
+        if m:
+            by_uuid.setdefault(m.group(0).lower(), []).append(rel)
+    for rels in by_uuid.values():
+        for other in rels[1:]:
+            flags.add(("uuid", rels[0], other, -1))
+    return sorted(flags, key=lambda f: (f[1], f[2], f[0]))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build gallery derivatives in parallel and flag duplicates.")
+    ap.add_argument("--gallery", default=GALLERY_DIR)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--threshold", type=int, default=NEAR_DUP_BITS, help="near-duplicate dHash distance")
+    args = ap.parse_args(argv)
+
+    start = time.perf_counter()
+    count = errors = 0
+    try:
+        for rel, rec, error in ingest(args.gallery, args.workers):
+            count += 1
+            if error:
+                errors += 1
+                print(f"  ! {rel}: {error}", file=sys.stderr)
+            elapsed = time.perf_counter() - start
+            print(f"[{count}] {rel}  ({count / elapsed:.1f} img/s)")
+    except KeyboardInterrupt:
+        print("interrupted — progress saved, re-run to resume", file=sys.stderr)
+        return 130
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f"processed {count} image(s) in {elapsed:.2f}s — {rate:.1f} img/s, {errors} error(s)")
+
+    rels = set(get_gallery_images(args.gallery))
+    records = {rel: r for rel, r in default_store.records.items() if rel in rels}
+    for kind, a, b, d in find_duplicates(records, args.threshold):
+        detail = f" (distance {d})" if kind == "near" else ""
+        print(f"duplicate[{kind}]: {a} <-> {b}{detail}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
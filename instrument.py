@@ -0,0 +1,151 @@
+# instrument.py
+# Hot-path instrumentation shared by every session in the process (module state survives reruns).
+# - timed("stage") / @timed_fn("stage") record a latency sample per call; record_size() records byte counts
+# - per metric: call count, a fixed-bucket histogram and a window of recent samples for p50/p95
+# - start_profile() / finish_profile(): optional cProfile capture of a single run, dumped as a .prof file
+# - record_startup(): the process's first run (cold start); STARTUP_METRICS=1 also logs it as one JSON line to stderr
+# Cost per sample is two perf_counter() calls and a short lock, cheap enough to leave on.
+
+import io
+import os
+import sys
+import json
+import time
+import bisect
+import pstats
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+SAMPLE_WINDOW = 2000        # most recent samples kept per metric for percentiles
+LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)                 # ms, upper bounds
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)  # bytes, upper bounds
+PROFILE_LINES = 25
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+def bucket_labels(bounds, unit):
+    return [f"≤{b:g}{unit}" for b in bounds] + [f">{bounds[-1]:g}{unit}"]
+
+class Metric:
+    def __init__(self, bounds, window=SAMPLE_WINDOW):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)   # last bucket counts everything above bounds[-1]
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.last = value
+        self.samples.append(value)
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+
+    def summary(self):
+        vals = sorted(self.samples)
+        return {"count": self.count, "total": self.total, "last": self.last,
+                "p50": percentile(vals, 50), "p95": percentile(vals, 95),
+                "max": vals[-1] if vals else 0.0, "histogram": list(self.buckets)}
+
+class Instruments:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}   # stage -> Metric of milliseconds
+        self.sizes = {}     # name -> Metric of bytes
+
+    def record(self, stage, seconds):
+        with self.lock:
+            metric = self.timings.get(stage)
+            if metric is None:
+                metric = self.timings[stage] = Metric(LATENCY_BUCKETS)
+            metric.add(seconds * 1000)
+
+    def record_size(self, name, nbytes):
+        with self.lock:
+            metric = self.sizes.get(name)
+            if metric is None:
+                metric = self.sizes[name] = Metric(SIZE_BUCKETS)
+            metric.add(nbytes)
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def timed_fn(self, stage):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def stats(self):
+        with self.lock:
+            return {"timings": {k: m.summary() for k, m in self.timings.items()},
+                    "sizes": {k: m.summary() for k, m in self.sizes.items()}}
+
+    def clear(self):
+        with self.lock:
+            self.timings.clear()
+            self.sizes.clear()
+
+# shared instance, like content_cache.cache: counters accumulate across reruns and sessions
+instruments = Instruments()
+timed = instruments.timed
+timed_fn = instruments.timed_fn
+record = instruments.record
+record_size = instruments.record_size
+
+# ---------------- cold start ----------------
+startup = {}    # filled by the first run in this process (see record_startup)
+_startup_lock = threading.Lock()
+
+def record_startup(imports_s, first_render_s, ready_s):
+    """Record the first run's import, first-render and fully-filled-in times; later calls are ignored."""
+    with _startup_lock:
+        if startup:
+            return False
+        startup.update(imports_ms=round(imports_s * 1000, 1), first_render_ms=round(first_render_s * 1000, 1),
+                       ready_ms=round(ready_s * 1000, 1), pid=os.getpid())
+    record("startup:imports", imports_s)
+    record("startup:first_render", first_render_s)
+    record("startup:ready", ready_s)
+    if os.environ.get("STARTUP_METRICS"):
+        print("startup " + json.dumps(startup), file=sys.stderr, flush=True)
+    return True
+
+# ---------------- single-run profiles ----------------
+def start_profile():
+    """Start a cProfile capture; returns None when another profiler is already running in this process."""
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        return None  # only one profiler can be active at a time (e.g. another session is profiling)
+    return prof
+
+def finish_profile(prof, out_dir, limit=PROFILE_LINES):
+    """Stop the capture, dump it to out_dir as a .prof file and return (path, top functions as text)."""
+    prof.disable()
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, time.strftime("run-%Y%m%d-%H%M%S.prof"))
+    prof.dump_stats(path)
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return path, buf.getvalue()
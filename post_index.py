@@ -0,0 +1,253 @@
+# post_index.py
+# Persistent blog index built from post front matter (title, date, author, summary, slug).
+# - Stored as a JSON sidecar in .cache/ so a cold process doesn't re-read every post; the save is debounced
+#   (SAVE_DELAY) and runs on a snapshot outside the lock, so readers never wait for the file to be written
+# - Refreshed incrementally: only files whose (mtime, size) changed are re-read; markdown is never rendered here
+# - Kept sorted newest-first by the parsed front-matter date (file mtime when the date is missing/unparseable)
+# - Pages of summaries are slices of the sorted list; full bodies come from content_cache on demand
+# - The full-text search index (post_search.py) is updated in the same pass and stored in the same sidecar
+# - So are the related-posts index (post_related.py, MinHash/LSH) and the tag pages (front matter "tags:"),
+#   so both are lookups at request time
+
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+
+from content import CACHE_DIR, POSTS_DIR, parse_front_matter, parse_tags
+from instrument import record
+from post_related import RELATED_K, RelatedIndex
+from post_search import SearchIndex, plain_text
+
+INDEX_VERSION = 3
+INDEX_PATH = os.path.join(CACHE_DIR, "post_index.json")
+PER_PAGE = 5
+REFRESH_INTERVAL = 1.0  # seconds; reruns closer together than this reuse the last scan
+SAVE_DELAY = 2.0        # seconds after a change before the sidecar is rewritten (later changes join that save)
+SUMMARY_CHARS = 220
+RESORT_TAGS = 8         # touched tags re-sorted one by one; more than this rebuilds every tag page at once
+DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%Y-%m-%d", "%Y/%m/%d", "%d %B %Y", "%d %b %Y", "%d/%m/%Y", "%B %Y")
+
+def parse_date(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+def make_summary(body):
+    # first paragraph of the raw markdown, with the most common markup stripped
+    for para in re.split(r'\n\s*\n', body):
+        text = re.sub(r'^[#>*\-\s]+', '', para.strip(), flags=re.MULTILINE)
+        text = re.sub(r'[*_`]|!?\[([^\]]*)\]\([^)]*\)', r'\1', text)
+        text = " ".join(text.split())
+        if text:
+            return text if len(text) <= SUMMARY_CHARS else text[:SUMMARY_CHARS].rsplit(' ', 1)[0] + "…"
+    return ""
+
+def read_entry(slug, path, sig):
+    """Return (index entry, markdown body) for one post file."""
+    with open(path, "r", encoding="utf-8") as fh:
+        txt = fh.read()
+    meta, body = parse_front_matter(txt)
+    parsed = parse_date(meta.get("date", ""))
+    sort_key = (parsed or datetime.fromtimestamp(sig[0] / 1e9)).isoformat()
+    entry = {
+        "slug": slug,
+        "title": meta.get("title", slug.replace('-', ' ').title()),
+        "date": meta.get("date", ""),
+        "author": meta.get("author", ""),
+        "summary": meta.get("summary", "") or make_summary(body),
+        "tags": parse_tags(meta.get("tags", "")),
+        "sort_key": sort_key,
+        "sig": list(sig),
+    }
+    return entry, body
+
+class PostIndex:
+    def __init__(self, posts_dir=POSTS_DIR, index_path=INDEX_PATH):
+        self.posts_dir = posts_dir
+        self.index_path = index_path
+        self.lock = threading.RLock()
+        self.entries = {}   # slug -> entry
+        self.order = []     # slugs, newest first
+        self.search_index = SearchIndex()
+        self.related_index = RelatedIndex()
+        self.tag_order = {} # tag -> slugs, newest first
+        self.version = 0
+        self.last_refresh = 0.0
+        self.save_lock = threading.Lock()   # one sidecar write at a time, in snapshot order
+        self.save_timer = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("posts_dir") != self.posts_dir:
+            return
+        self.entries = {e["slug"]: e for e in data.get("posts", [])}
+        self.search_index = SearchIndex.from_json(data.get("search", {}))
+        self.related_index = RelatedIndex.from_json(data.get("related", {}))
+        self._sort()
+        self._sort_tags()
+
+    def _snapshot(self):
+        # taken under self.lock; entries and the indexes' records are replaced on change, so shallow copies do
+        return [self.entries[s] for s in self.order], self.search_index.snapshot(), self.related_index.snapshot()
+
+    def _write(self, snapshot):
+        posts, search, related = snapshot
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": INDEX_VERSION, "posts_dir": self.posts_dir, "posts": posts,
+                       "search": SearchIndex.encode(search), "related": RelatedIndex.encode(related)},
+                      fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    def _schedule_save(self):
+        if self.save_timer is None:
+            self.save_timer = threading.Timer(SAVE_DELAY, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    def flush(self):
+        """Write pending changes to the sidecar now instead of after SAVE_DELAY (e.g. before a CLI exits)."""
+        with self.save_lock:
+            with self.lock:
+                if self.save_timer is None:
+                    return
+                self.save_timer.cancel()
+                self.save_timer = None
+                snapshot = self._snapshot()
+            try:
+                self._write(snapshot)
+            except OSError:
+                pass  # read-only deploys still get the in-memory index
+
+    def _sort(self):
+        self.order = sorted(self.entries, key=lambda s: (self.entries[s]["sort_key"], s), reverse=True)
+
+    def _sort_tags(self, tags=None):
+        # tag pages follow self.order; after a small change only the tags of the changed posts are redone,
+        # a bulk change (or a load) is one pass over every post
+        if tags is None or len(tags) > RESORT_TAGS:
+            self.tag_order = {}
+            for slug in self.order:
+                for tag in self.entries[slug]["tags"]:
+                    self.tag_order.setdefault(tag, []).append(slug)
+            return
+        for tag in tags:
+            slugs = [s for s in self.order if tag in self.entries[s]["tags"]]
+            if slugs:
+                self.tag_order[tag] = slugs
+            else:
+                self.tag_order.pop(tag, None)
+
+    def _related_terms(self, slug):
+        # the search index already holds the post's stemmed terms; tags join them as "#tag"
+        return set(self.search_index.docs[slug]["terms"]) | {"#" + t for t in self.entries[slug]["tags"]}
+
+    def refresh(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_refresh < REFRESH_INTERVAL:
+                return False
+            self.last_refresh = now
+            started = time.perf_counter()
+            seen = set()
+            changed = False
+            touched_tags = set()
+            if os.path.isdir(self.posts_dir):
+                with os.scandir(self.posts_dir) as it:
+                    for de in it:
+                        if not de.name.endswith(".md") or not de.is_file():
+                            continue
+                        slug = de.name[:-3]
+                        seen.add(slug)
+                        st = de.stat()
+                        sig = [st.st_mtime_ns, st.st_size]
+                        entry = self.entries.get(slug)
+                        if entry and entry["sig"] == sig:
+                            continue
+                        if entry:
+                            touched_tags.update(entry["tags"])
+                        try:
+                            entry, body = read_entry(slug, de.path, sig)
+                        except (OSError, UnicodeDecodeError):
+                            if self.entries.pop(slug, None):
+                                changed = True
+                            self.search_index.remove(slug)
+                            self.related_index.remove(slug)
+                            continue
+                        self.entries[slug] = entry
+                        touched_tags.update(entry["tags"])
+                        self.search_index.add(slug, entry["title"], plain_text(body))
+                        self.related_index.add(slug, self._related_terms(slug))
+                        changed = True
+            for slug in [s for s in self.entries if s not in seen]:
+                touched_tags.update(self.entries.pop(slug)["tags"])
+                self.search_index.remove(slug)
+                self.related_index.remove(slug)
+                changed = True
+            record("scan:post_index", time.perf_counter() - started)
+            if changed:
+                self._sort()
+                self._sort_tags(touched_tags)
+                self.version += 1
+                self._schedule_save()
+            return changed
+
+    def _page_of(self, slugs, number, per_page):
+        pages = max(1, -(-len(slugs) // per_page))
+        number = min(max(1, number), pages)
+        start = (number - 1) * per_page
+        return [self.entries[s] for s in slugs[start:start + per_page]], number, pages
+
+    def page(self, number, per_page=PER_PAGE):
+        with self.lock:
+            return self._page_of(self.order, number, per_page)
+
+    def tag_page(self, tag, number, per_page=PER_PAGE):
+        """One page of the posts tagged `tag`, newest first (precomputed in refresh)."""
+        with self.lock:
+            return self._page_of(self.tag_order.get(tag, []), number, per_page)
+
+    def tags(self):
+        """[(tag, number of posts)], most used first."""
+        with self.lock:
+            return sorted(((t, len(s)) for t, s in self.tag_order.items()), key=lambda item: (-item[1], item[0]))
+
+    def related(self, slug, k=RELATED_K):
+        """Index entries of the posts most similar to slug (precomputed by post_related.py)."""
+        with self.lock:
+            return [self.entries[other] for _, other in self.related_index.related(slug, k) if other in self.entries]
+
+    def get(self, slug):
+        with self.lock:
+            return self.entries.get(slug)
+
+    def search(self, query, k=10):
+        """Ranked hits for a full-text query: index entries plus "score" and an HTML "snippet"."""
+        with self.lock:
+            return [dict(self.entries[hit["id"]], score=hit["score"], snippet=hit["snippet"])
+                    for hit in self.search_index.search(query, k) if hit["id"] in self.entries]
+
+    def __len__(self):
+        return len(self.order)
+
+# shared instance, like content_cache.cache
+index = PostIndex()
@@ -0,0 +1,170 @@
+# post_related.py
+# "Related posts" without comparing every post with every other one (kept up to date by post_index.py,
+# persisted in its sidecar).
+# - Each post is a set of terms (title + body, stemmed like search) plus its tags as "#tag";
+#   a MinHash signature of NUM_PERM values estimates the Jaccard similarity of two such sets
+# - LSH: the signature is cut into BANDS bands of ROWS values; posts sharing a band are candidates
+#   (similar posts collide with high probability, unrelated ones rarely). Work per post is bounded even when
+#   thousands of posts share a band: each bucket contributes a sample, and only the MAX_CANDIDATES posts
+#   sharing the most bands are scored
+# - Top-k related lists are precomputed: adding, changing or removing a post re-scores only its candidates
+#   and the posts that listed it
+# - On disk: signatures (packed, base64) and the top-k lists; the band buckets are rebuilt from the signatures
+
+import base64
+import heapq
+import struct
+import hashlib
+import operator
+import threading
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+RELATED_K = 5
+MIN_SIMILARITY = 0.1        # estimated Jaccard below this isn't "related"
+BUCKET_SAMPLE = 16          # members taken from each bucket a post falls into
+MAX_CANDIDATES = 32         # posts scored per lookup: those sharing the most bands
+SIG = struct.Struct(f"<{NUM_PERM}I")
+
+@lru_cache(maxsize=262144)
+def term_hashes(term):
+    # NUM_PERM independent 32-bit hashes of one term from a single extendable-output digest
+    # (stable across processes, unlike hash())
+    return SIG.unpack(hashlib.shake_128(term.encode("utf-8")).digest(4 * NUM_PERM))
+
+def minhash(terms):
+    """Signature of a set of terms: per hash function, the minimum over the set."""
+    rows = [term_hashes(t) for t in set(terms)]
+    if not rows:
+        return None
+    return tuple(map(min, zip(*rows)))
+
+def similarity(a, b):
+    """Estimated Jaccard similarity: the fraction of hash functions on which two signatures agree."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+def band_keys(sig):
+    return [(i,) + sig[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+class RelatedIndex:
+    def __init__(self, k=RELATED_K):
+        self.k = k
+        self.lock = threading.RLock()
+        self.sigs = {}          # doc id -> signature
+        self.buckets = {}       # band key -> set of doc ids
+        self.top = {}           # doc id -> [(similarity, other id)], best first, at most k
+        self.listed_by = {}     # doc id -> ids whose top list contains it (not stored, rebuilt on load)
+
+    def __len__(self):
+        return len(self.sigs)
+
+    def _candidates(self, doc_id, sig):
+        shared = Counter()
+        for key in band_keys(sig):
+            bucket = self.buckets.get(key)
+            if bucket:
+                shared.update(islice(bucket, BUCKET_SAMPLE + 1))
+        shared.pop(doc_id, None)
+        return [c for c, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def _scored(self, doc_id):
+        sig = self.sigs[doc_id]
+        return [(similarity(sig, self.sigs[c]), c) for c in self._candidates(doc_id, sig)]
+
+    def _best(self, scored):
+        return heapq.nlargest(self.k, (entry for entry in scored if entry[0] >= MIN_SIMILARITY))
+
+    def _set_top(self, doc_id, top):
+        old = {o for _, o in self.top.get(doc_id, ())}
+        new = {o for _, o in top}
+        for o in old - new:
+            self.listed_by[o].discard(doc_id)
+        for o in new - old:
+            self.listed_by[o].add(doc_id)
+        self.top[doc_id] = top
+
+    def _offer(self, doc_id, score, other):
+        top = [entry for entry in self.top[doc_id] if entry[1] != other]
+        if score < MIN_SIMILARITY or (len(top) >= self.k and (score, other) <= top[-1]):
+            return
+        top.append((score, other))
+        top.sort(reverse=True)
+        self._set_top(doc_id, top[:self.k])
+
+    def add(self, doc_id, terms):
+        """Index (or re-index) one document from its term set; returns False when its signature didn't change."""
+        sig = minhash(terms)
+        with self.lock:
+            if sig is not None and self.sigs.get(doc_id) == sig:
+                return False
+            self.remove(doc_id)
+            if sig is None:
+                return True
+            self.sigs[doc_id] = sig
+            self.listed_by[doc_id] = set()
+            for key in band_keys(sig):
+                self.buckets.setdefault(key, set()).add(doc_id)
+            scored = self._scored(doc_id)
+            self._set_top(doc_id, self._best(scored))
+            # every candidate may rank this post in its own top k, not just the ones in this post's
+            for score, other in scored:
+                self._offer(other, score, doc_id)
+            return True
+
+    def remove(self, doc_id):
+        with self.lock:
+            sig = self.sigs.pop(doc_id, None)
+            if sig is None:
+                return
+            for key in band_keys(sig):
+                bucket = self.buckets[key]
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self.buckets[key]
+            self._set_top(doc_id, [])
+            del self.top[doc_id]
+            for other in list(self.listed_by[doc_id]):
+                self._set_top(other, self._best(self._scored(other)))
+            del self.listed_by[doc_id]
+
+    def related(self, doc_id, k=None):
+        """Precomputed [(similarity, id)] for doc_id, most similar first."""
+        with self.lock:
+            return self.top.get(doc_id, [])[:k or self.k]
+
+    # ---------------- compact serialisation ----------------
+    def snapshot(self):
+        """Cheap copy of the state to_json() needs; signatures and top lists are replaced, never changed in place."""
+        with self.lock:
+            return self.k, dict(self.sigs), dict(self.top)
+
+    @staticmethod
+    def encode(snapshot):
+        k, sigs, tops = snapshot
+        # similarities are stored as the number of agreeing hashes, so they load back exactly
+        return {"k": k,
+                "sigs": {d: base64.b64encode(SIG.pack(*sig)).decode("ascii") for d, sig in sigs.items()},
+                "top": {d: [[o, round(s * NUM_PERM)] for s, o in top] for d, top in tops.items()}}
+
+    def to_json(self):
+        return self.encode(self.snapshot())
+
+    @classmethod
+    def from_json(cls, data):
+        index = cls(data.get("k", RELATED_K))
+        for doc_id, packed in data.get("sigs", {}).items():
+            packed = base64.b64decode(packed)
+            if len(packed) != SIG.size:
+                continue
+            index.sigs[doc_id] = sig = SIG.unpack(packed)
+            for key in band_keys(sig):
+                index.buckets.setdefault(key, set()).add(doc_id)
+        top = data.get("top", {})
+        index.listed_by = {doc_id: set() for doc_id in index.sigs}
+        for doc_id in index.sigs:
+            index._set_top(doc_id, [(n / NUM_PERM, o) for o, n in top.get(doc_id, []) if o in index.sigs])
+        return index
@@ -0,0 +1,158 @@
+# post_search.py
+# Full-text search over blog posts (kept up to date by post_index.py, persisted in its sidecar).
+# - Title + body text are tokenised and stemmed with textutil.py, the same rules as the chat engine
+# - Inverted index: term -> {doc: term frequency}; adding, changing or removing a post only touches its own terms
+# - Compact on disk: docs become small integers and each postings list is a flat [doc gap, tf, doc gap, tf, ...]
+# - BM25 ranking with a title boost; results carry a snippet around the densest cluster of matches, with <mark> highlights
+
+import html
+import math
+import re
+import heapq
+import bisect
+import threading
+from functools import lru_cache
+
+from textutil import TOKEN_RE, normalize_text, stem, tokenize
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3        # a title term counts like this many body occurrences
+SNIPPET_WORDS = 28
+MAX_RESULTS = 10
+
+def plain_text(body):
+    """Markdown body -> readable text (markup, link targets and images stripped) for indexing and snippets."""
+    text = re.sub(r'```.*?```', ' ', body, flags=re.DOTALL)
+    text = re.sub(r'!\[[^\]]*\]\([^)]*\)', ' ', text)
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = re.sub(r'^[#>*\-\s]+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[*_`]', '', text)
+    return " ".join(text.split())
+
+@lru_cache(maxsize=65536)
+def word_term(word):
+    # snippets re-tokenise the same vocabulary over and over; memoise the normalise+stem step
+    return stem(normalize_text(word))
+
+def make_snippet(text, terms, words=SNIPPET_WORDS):
+    """HTML snippet of about `words` words from text, positioned on the most query terms, matches in <mark>."""
+    toks = list(TOKEN_RE.finditer(text))
+    if not toks:
+        return ""
+    hits = [i for i, m in enumerate(toks) if word_term(m.group()) in terms]
+    start = 0
+    if hits:
+        # the window that starts at a hit and covers the most hits
+        best = max(range(len(hits)), key=lambda j: (bisect.bisect_right(hits, hits[j] + words - 1) - j, -j))
+        start = max(0, hits[best] - 3)
+    end = min(len(toks), start + words)
+    marked = set(hits)
+    out, pos = [], toks[start].start()
+    for i in range(start, end):
+        m = toks[i]
+        out.append(html.escape(text[pos:m.start()]))
+        word = html.escape(m.group())
+        out.append(f"<mark>{word}</mark>" if i in marked else word)
+        pos = m.end()
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if end < len(toks) else html.escape(text[pos:])
+    return prefix + "".join(out).strip() + suffix
+
+class SearchIndex:
+    def __init__(self, k1=K1, b=B):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.docs = {}          # doc id (slug) -> {"title", "text", "length", "terms": {term: frequency}}
+        self.postings = {}      # term -> {doc id: term frequency}
+        self.total_length = 0
+
+    def add(self, doc_id, title, text):
+        """Index (or re-index) one document; text is plain text (see plain_text)."""
+        tf = {}
+        for t in tokenize(title) * TITLE_WEIGHT + tokenize(text):
+            tf[t] = tf.get(t, 0) + 1
+        with self.lock:
+            self.remove(doc_id)
+            length = sum(tf.values())
+            self.docs[doc_id] = {"title": title, "text": text, "length": length, "terms": tf}
+            for t, n in tf.items():
+                self.postings.setdefault(t, {})[doc_id] = n
+            self.total_length += length
+
+    def remove(self, doc_id):
+        with self.lock:
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                return
+            for t in doc["terms"]:
+                plist = self.postings[t]
+                del plist[doc_id]
+                if not plist:
+                    del self.postings[t]
+            self.total_length -= doc["length"]
+
+    def __len__(self):
+        return len(self.docs)
+
+    def search(self, query, k=MAX_RESULTS):
+        """Return up to k hits as dicts {id, title, score, snippet} (snippet is HTML), best first."""
+        terms = set(tokenize(query))
+        with self.lock:
+            n_docs = len(self.docs)
+            if not n_docs or not terms:
+                return []
+            docs = self.docs
+            base = self.k1 * (1 - self.b)
+            per_len = self.k1 * self.b * n_docs / max(1, self.total_length)
+            scores = {}
+            for t in terms:
+                plist = self.postings.get(t)
+                if not plist:
+                    continue
+                weight = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5)) * (self.k1 + 1)
+                for doc_id, tf in plist.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + base + per_len * docs[doc_id]["length"])
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [{"id": doc_id, "title": self.docs[doc_id]["title"], "score": round(score, 4),
+                     "snippet": make_snippet(self.docs[doc_id]["text"], terms)} for doc_id, score in best]
+
+    # ---------------- compact serialisation ----------------
+    def snapshot(self):
+        """Cheap copy of the state to_json() needs; doc records are replaced, never changed in place."""
+        with self.lock:
+            return dict(self.docs)
+
+    @staticmethod
+    def encode(docs):
+        # postings are rebuilt from each doc's own terms, so a snapshot can be encoded without the lock
+        ids = sorted(docs)
+        terms, last = {}, {}
+        for n, doc_id in enumerate(ids):
+            for t, tf in docs[doc_id]["terms"].items():
+                terms.setdefault(t, []).extend((n - last.get(t, 0), tf))
+                last[t] = n
+        return {"docs": [[d, docs[d]["title"], docs[d]["text"]] for d in ids], "terms": terms}
+
+    def to_json(self):
+        return self.encode(self.snapshot())
+
+    @classmethod
+    def from_json(cls, data):
+        index = cls()
+        ids = []
+        for doc_id, title, text in data.get("docs", []):
+            ids.append(doc_id)
+            index.docs[doc_id] = {"title": title, "text": text, "length": 0, "terms": {}}
+        for t, flat in data.get("terms", {}).items():
+            plist, n = {}, 0
+            for i in range(0, len(flat), 2):
+                n += flat[i]
+                doc = index.docs[ids[n]]
+                plist[ids[n]] = doc["terms"][t] = flat[i + 1]
+                doc["length"] += flat[i + 1]
+            index.postings[t] = plist
+        index.total_length = sum(d["length"] for d in index.docs.values())
+        return index
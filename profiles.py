@@ -0,0 +1,229 @@
+# profiles.py
+# Many portfolios from one process: a profile (tenant) is a directory under profiles/ with
+#   profile.json   name, brand, first_name, tagline, roles, linkedin, instagram, resume, name_answer, facts, faqs
+#   gallery/       optional, same rules as the site's gallery/
+#   blog_posts/    optional, same rules as the site's blog_posts/
+# The site's own profile ("aryan", the default) keeps using gallery/, blog_posts/ and facts.py.
+# - Tenants are loaded on first request and routed by ?profile=<slug> (app.py) or a /u/<slug>/ path prefix (chat_server.py)
+# - Per-tenant state (content cache + assembled pages, post/search index, writings store, chat engine) is built lazily
+#   and kept in an LRU bounded by an estimate of its memory, so thousands of profiles don't all stay loaded
+# - profile.json is re-read when it changes; sidecars go to .cache/tenants/<slug>/
+
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+
+from answer_engine import AnswerEngine, engine as default_engine
+from content import BASE_DIR, CACHE_DIR, GALLERY_DIR, POSTS_DIR
+from content_cache import ContentCache, cache as default_cache, file_signature
+from facts import ARYAN_FACTS, FAQS
+from post_index import PostIndex, index as default_index
+from site_page import DEFAULT_PROFILE
+from writings import WritingStore, store as default_writings
+
+PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
+TENANT_CACHE_DIR = os.path.join(CACHE_DIR, "tenants")
+DEFAULT_SLUG = "aryan"
+SLUG_RE = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+MAX_BYTES = 256 * 1024 * 1024   # estimated memory of all loaded tenants (the default one is never evicted)
+MAX_TENANTS = 2000
+TENANT_OVERHEAD = 32 * 1024     # objects, dicts and locks every loaded tenant carries regardless of content
+
+def default_profile():
+    return dict(DEFAULT_PROFILE, slug=DEFAULT_SLUG, facts=ARYAN_FACTS, faqs=FAQS,
+                gallery_dir=GALLERY_DIR, posts_dir=POSTS_DIR)
+
+def load_profile(slug, root=PROFILES_DIR):
+    """Read profiles/<slug>/profile.json into a profile dict; None when the slug or file is invalid."""
+    if not SLUG_RE.match(slug or ""):
+        return None
+    folder = os.path.join(root, slug)
+    try:
+        with open(os.path.join(folder, "profile.json"), "r", encoding="utf-8") as fh:
+            config = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(config, dict) or not isinstance(config.get("name"), str) or not config["name"].strip():
+        return None
+    first = config["name"].split()[0]
+    profile = {"brand": first.upper(), "first_name": first, "tagline": "", "roles": [], "linkedin": "#",
+               "instagram": "#", "resume": "#", "name_answer": config["name"], "facts": {}, "faqs": []}
+    profile.update({k: v for k, v in config.items() if k in DEFAULT_PROFILE or k in ("facts", "faqs")})
+    if not valid_profile(profile):
+        return None
+    profile.update(slug=slug, gallery_dir=os.path.join(folder, "gallery"), posts_dir=os.path.join(folder, "blog_posts"))
+    return profile
+
+def is_str_list(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+def valid_faq(faq):
+    return (isinstance(faq, dict) and isinstance(faq.get("q"), str) and isinstance(faq.get("a"), str)
+            and is_str_list(faq.get("keywords", [])))
+
+def valid_profile(profile):
+    # the page and the chat engine take these shapes on trust, so a malformed profile.json is rejected up front
+    if any(not isinstance(profile[k], str) for k in DEFAULT_PROFILE if k != "roles"):
+        return False
+    if not is_str_list(profile["roles"]) or not isinstance(profile["faqs"], list):
+        return False
+    if not isinstance(profile["facts"], dict) or not all(isinstance(v, str) for v in profile["facts"].values()):
+        return False
+    return all(valid_faq(faq) for faq in profile["faqs"])
+
+def profile_signature(slug, root=PROFILES_DIR):
+    return file_signature(os.path.join(root, slug, "profile.json"))
+
+class Tenant:
+    """One loaded profile and its lazily built state; the default tenant wraps the shared module instances."""
+
+    def __init__(self, profile, sig=None):
+        self.profile = profile
+        self.slug = profile["slug"]
+        self.sig = sig
+        self.lock = threading.RLock()
+        self.closed = False
+        self._content = self._index = self._writings = self._engine = None
+        self._weight = (None, 0)    # (state it was measured at, bytes)
+        if self.slug == DEFAULT_SLUG:
+            self._content, self._index = default_cache, default_index
+            self._writings, self._engine = default_writings, default_engine
+
+    def _cache_path(self, name):
+        return os.path.join(TENANT_CACHE_DIR, self.slug, name)
+
+    @property
+    def content(self):
+        with self.lock:
+            if self._content is None:
+                self._content = ContentCache(self.profile["posts_dir"], self.profile["gallery_dir"])
+            return self._content
+
+    @property
+    def index(self):
+        with self.lock:
+            if self._index is None:
+                self._index = PostIndex(self.profile["posts_dir"], self._cache_path("post_index.json"))
+            return self._index
+
+    @property
+    def writings(self):
+        with self.lock:
+            if self._writings is None:
+                self._writings = WritingStore(self._cache_path("writings.sqlite3"))
+            return self._writings
+
+    @property
+    def engine(self):
+        with self.lock:
+            if self._engine is None:
+                self._engine = AnswerEngine.from_facts(self.profile["facts"], self.profile["faqs"],
+                                                       self.profile["first_name"])
+            return self._engine
+
+    def _state(self):
+        # changes whenever something weight() counts may have changed
+        content, index, engine = self._content, self._index, self._engine
+        return (None if content is None else (content.posts_version, content.pages_version, len(content.post_entries)),
+                None if index is None else (index.version, len(index.entries)),
+                None if engine is None else len(engine))
+
+    def weight(self):
+        """Rough bytes held by this tenant: cached pages, rendered posts, index text and chat documents.
+
+        Re-measured only when the content, index or engine changed since the last call.
+        """
+        state = self._state()
+        if self._weight[0] == state:
+            return self._weight[1]
+        size = TENANT_OVERHEAD + sum(len(k) + len(v) for k, v in self.profile["facts"].items())
+        if self._content is not None:
+            pages = list(self._content.pages.values()) + list(self._content.search_pages.values())
+            size += sum(len(html) for html in pages)
+            size += sum(len(p["html"]) for _, p in list(self._content.post_entries.values()) if p)
+        if self._index is not None:
+            size += 512 * len(self._index.entries)
+            size += 2 * sum(len(d["text"]) for d in list(self._index.search_index.docs.values()))
+        if self._engine is not None:
+            size += 256 * len(self._engine)
+        self._weight = (state, size)
+        return size
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self._writings is not None:
+                self._writings.close()
+
+class TenantRegistry:
+    def __init__(self, root=PROFILES_DIR, max_bytes=MAX_BYTES, max_tenants=MAX_TENANTS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_tenants = max_tenants
+        self.lock = threading.RLock()
+        self.default = Tenant(default_profile())
+        self.tenants = OrderedDict()    # slug -> Tenant, least recently used first
+        self.weights = {}               # slug -> weight measured at its last access
+        self.total = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, slug):
+        """Return the Tenant for slug (the default for "" or DEFAULT_SLUG), or None for an unknown profile."""
+        if not slug or slug == DEFAULT_SLUG:
+            return self.default
+        if not SLUG_RE.match(slug):
+            return None
+        sig = profile_signature(slug, self.root)
+        with self.lock:
+            tenant = self.tenants.get(slug)
+            if tenant is not None and tenant.sig == sig:
+                self.hits += 1
+                self.tenants.move_to_end(slug)
+                return tenant
+            self.misses += 1
+            if tenant is not None:
+                self._drop(slug)    # profile.json changed or disappeared
+            if sig is None:
+                return None
+            profile = load_profile(slug, self.root)
+            if profile is None:
+                return None
+            tenant = self.tenants[slug] = Tenant(profile, sig)
+            self.weights[slug] = 0
+            return tenant
+
+    def touch(self, tenant):
+        """Re-measure a tenant after a request has used it and evict least recently used ones over budget."""
+        if tenant is self.default:
+            return
+        with self.lock:
+            if self.tenants.get(tenant.slug) is not tenant:
+                return
+            weight = tenant.weight()
+            self.total += weight - self.weights[tenant.slug]
+            self.weights[tenant.slug] = weight
+            while self.tenants and (self.total > self.max_bytes or len(self.tenants) > self.max_tenants):
+                oldest = next(iter(self.tenants))
+                if oldest == tenant.slug and len(self.tenants) == 1:
+                    break   # a single tenant over budget still serves its own request
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, slug):
+        tenant = self.tenants.pop(slug)
+        self.total -= self.weights.pop(slug, 0)
+        tenant.close()
+
+    def stats(self):
+        with self.lock:
+            return {"loaded": len(self.tenants), "bytes": self.total, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def profile_query(tenant):
+    """Query-string prefix that keeps links on the same profile ("" for the default one)."""
+    return "" if tenant.slug == DEFAULT_SLUG else f"profile={tenant.slug}&"
+
+# shared instance, like content_cache.cache
+registry = TenantRegistry()
@@ -0,0 +1,98 @@
+# site_page.py
+# The site's HTML template (templates/index.html) and its placeholder filling.
+# Shared by the Streamlit app (app.py) and the static export (build.py) so both render the same page.
+# Person-specific text (name, tagline, roles, socials) comes from a profile dict (see profiles.py);
+# DEFAULT_PROFILE is the site's own.
+
+import os
+import re
+import html
+import json
+import threading
+
+from content import BASE_DIR, build_writings_html
+
+TEMPLATE_PATH = os.path.join(BASE_DIR, "templates", "index.html")
+
+# ---------------- Socials ----------------
+LINKEDIN = "https://www.linkedin.com/in/aryan-sharma99999"
+INSTAGRAM = "https://instagram.com/aryanxsharma26"
+
+DEFAULT_PROFILE = {
+    "name": "Aryan Sharma",
+    "brand": "ARYAN",
+    "first_name": "Aryan",
+    "tagline": "I design, build and tell stories through code.",
+    "roles": ["web developer", "tech enthusiast", "video editor", "writer", "learner"],
+    "linkedin": LINKEDIN,
+    "instagram": INSTAGRAM,
+    "resume": "/resume.pdf",
+    "name_answer": "Aryan Sharma — that guy who turns everyday moments into funny stories.",
+}
+
+_lock = threading.Lock()
+_template = {"sig": None, "text": "", "version": 0}
+
+def load_template():
+    # re-read only when the file changes; the version feeds page cache keys
+    with _lock:
+        st = os.stat(TEMPLATE_PATH)
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig != _template["sig"]:
+            with open(TEMPLATE_PATH, "r", encoding="utf-8") as fh:
+                _template.update(sig=sig, text=fh.read(), version=_template["version"] + 1)
+        return _template["text"]
+
+def template_version():
+    load_template()
+    return _template["version"]
+
+PLACEHOLDER_RE = re.compile(r"__([A-Z_]+)__")
+
+def fill_template(template, values):
+    # one pass over the template: inserted values (posts, writings, search queries) are never scanned again,
+    # so user text containing "__FACTS__" stays literal; unknown placeholders are left for a later fill
+    return PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), template)
+
+def js_literal(value):
+    # JSON is valid JS; escaping "</" keeps a value from closing the <script> element
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+def profile_values(profile):
+    p = dict(DEFAULT_PROFILE, **(profile or {}))
+    text = lambda key: html.escape(str(p[key]))
+    return {
+        "HERO_NAME": html.escape(p["name"].upper()),
+        "NAME": text("name"),
+        "BRAND": text("brand"),
+        "FIRST_NAME": text("first_name"),
+        "TAGLINE": text("tagline"),
+        "RESUME": text("resume"),
+        "ROLES": js_literal(list(p["roles"])),
+        "NAME_ANSWER": js_literal(p["name_answer"]),
+        "FIRST_NAME_JSON": js_literal(p["first_name"]),
+        "LINKEDIN": text("linkedin"),
+        "INSTAGRAM": text("instagram"),
+    }
+
+def page_values(gallery_html, posts_html, facts_json, chat_api="", year_str="", writings_html=None, profile=None,
+                content_state=""):
+    return {
+        "GALLERY_HTML": gallery_html,
+        "POSTS_HTML": posts_html,
+        "WRITINGS_HTML": build_writings_html([]) if writings_html is None else writings_html,
+        **profile_values(profile),
+        "YEAR": year_str,
+        # facts_json contains quotes and braces — inject raw JSON string literal into JS
+        "FACTS": facts_json,
+        "FACTS_URL": "",
+        "CHAT_API": chat_api,
+        # content_watcher state the page was built from; "" leaves live updates off
+        "CONTENT_STATE": content_state,
+    }
+
+def render_page(gallery_html, posts_html, facts_json, chat_api="", year_str="", template=None, writings_html=None,
+                profile=None, content_state=""):
+    template = load_template() if template is None else template
+    return fill_template(template, page_values(gallery_html, posts_html, facts_json, chat_api, year_str, writings_html,
+                                               profile, content_state))
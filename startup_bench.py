@@ -0,0 +1,74 @@
+# startup_bench.py
+# Cold-start measurement: runs app.py in fresh interpreters (Streamlit's AppTest, no browser) and reports
+# - process wall time, Streamlit's own import time
+# - the app's import time, time to first render (hero visible) and time until every section is filled in,
+#   as logged by instrument.record_startup() under STARTUP_METRICS=1
+# Each run is a new process, so module caches start empty; the .cache/ sidecars are left as they are
+# (delete them first to measure a container that starts without them).
+#
+# Usage:  python startup_bench.py [--runs 5] [--out startup.json]
+# In production, start Streamlit with STARTUP_METRICS=1 to get the same "startup {...}" line in the logs.
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+from content import BASE_DIR
+
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+RUN_TIMEOUT = 300
+
+CHILD = """
+import sys, json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+print("harness " + json.dumps({"streamlit_import_ms": round((t1 - t0) * 1000, 1),
+                               "errors": len(at.exception)}), file=sys.stderr, flush=True)
+"""
+
+def parse_lines(stderr, prefix):
+    for line in stderr.splitlines():
+        if line.startswith(prefix + " "):
+            return json.loads(line[len(prefix) + 1:])
+    return {}
+
+def one_run(app_path=APP_PATH):
+    env = dict(os.environ, STARTUP_METRICS="1")
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD, app_path], cwd=BASE_DIR, env=env,
+                          capture_output=True, text=True, timeout=RUN_TIMEOUT)
+    wall = time.perf_counter() - started
+    app = parse_lines(proc.stderr, "startup")
+    harness = parse_lines(proc.stderr, "harness")
+    if proc.returncode or not app or harness.get("errors"):
+        raise RuntimeError(f"app run failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    return {"process_ms": round(wall * 1000, 1), "streamlit_import_ms": harness["streamlit_import_ms"],
+            "imports_ms": app["imports_ms"], "first_render_ms": app["first_render_ms"], "ready_ms": app["ready_ms"]}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure app.py cold-start import and first-render times.")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--out", help="also write the per-run results and medians as JSON here")
+    args = ap.parse_args(argv)
+
+    runs = []
+    for i in range(args.runs):
+        runs.append(one_run())
+        print(f"run {i + 1}: " + "  ".join(f"{k} {v:.1f}" for k, v in runs[-1].items()), file=sys.stderr)
+    medians = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+    print("median over %d cold starts:" % len(runs))
+    for k, v in medians.items():
+        print(f"  {k:<20} {v:>9.1f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"runs": runs, "median": medians}, fh, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
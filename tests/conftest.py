@@ -0,0 +1,7 @@
+# conftest.py
+# The site's modules live at the repository root (Streamlit runs app.py from there); make them importable.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
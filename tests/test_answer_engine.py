@@ -0,0 +1,40 @@
+# test_answer_engine.py
+# Skipping common postings lists must never change what the chat engine answers.
+
+import random
+
+import answer_engine
+from answer_engine import AnswerEngine
+
+def exhaustive(monkeypatch, engine, query):
+    # every postings list counts as rare, so each one is walked in full
+    with monkeypatch.context() as m:
+        m.setattr(answer_engine, "COMMON_POSTINGS", 10 ** 9)
+        return engine.search(query)
+
+def test_fact_matching_only_common_terms_still_wins(monkeypatch):
+    engine = AnswerEngine()
+    engine.add("alpha beta", "AB")
+    for i in range(10000):
+        word = "alpha" if i < 300 else "beta" if i < 600 else "gamma" if i < 800 else "delta"
+        engine.add(f"{word} z{i}", f"x{i}")
+    assert engine.search("alpha beta gamma", 1)[0]["answer"] == "AB"
+    assert engine.search("alpha beta gamma") == exhaustive(monkeypatch, engine, "alpha beta gamma")
+
+def test_ranking_matches_exhaustive_scoring(monkeypatch):
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(40)] + [f"rare{i}" for i in range(2000)]
+    weights = [400] * 40 + [1] * 2000
+    engine = AnswerEngine()
+    for i in range(3000):
+        engine.add(" ".join(rng.choices(words, weights, k=4)), f"a{i}")
+    for _ in range(200):
+        query = " ".join(rng.choices(words, weights, k=3))
+        assert engine.search(query) == exhaustive(monkeypatch, engine, query)
+
+def test_question_words_alone_are_not_a_match():
+    engine = AnswerEngine.from_facts({"how does aryan relax": "Music.", "what does demo like": "Fast pages."}, [],
+                                     first_name="Demo")
+    assert engine.answer("how are you") == "Ask me anything about Demo ☕🙂!"
+    assert engine.answer("what is the capital of peru") == "Ask me anything about Demo ☕🙂!"
+    assert engine.answer("how does aryan relax?") == "Music."
@@ -0,0 +1,89 @@
+# test_post_related.py
+# The related-posts index is kept up to date incrementally; it must end up where a rebuild would,
+# and survive the sidecar round trip.
+
+import json
+import random
+
+from post_related import BUCKET_SAMPLE, MAX_CANDIDATES, MIN_SIMILARITY, RelatedIndex, similarity
+
+def topic_terms(rng, topic, own):
+    # mostly the topic's own words, plus one word no other post has
+    return {f"t{topic}w{i}" for i in rng.sample(range(40), 20)} | {f"only-{own}"}
+
+def build(docs, order=None):
+    index = RelatedIndex()
+    for doc_id in order or sorted(docs):
+        index.add(doc_id, docs[doc_id])
+    return index
+
+def check_consistent(index):
+    # listed_by is exactly the reverse of the top lists, and every listed score is the signatures' similarity
+    listed = {doc_id: set() for doc_id in index.sigs}
+    for doc_id, top in index.top.items():
+        assert len(top) <= index.k and top == sorted(top, reverse=True)
+        for score, other in top:
+            assert other != doc_id and other in index.sigs
+            assert score == similarity(index.sigs[doc_id], index.sigs[other]) >= MIN_SIMILARITY
+            listed[other].add(doc_id)
+    assert listed == index.listed_by
+    assert set(index.top) == set(index.sigs)
+
+def test_add_edit_remove_matches_rebuild():
+    rng = random.Random(3)
+    docs = {f"p{i:02d}": topic_terms(rng, i % 4, i) for i in range(32)}
+    index = build(docs)
+    for doc_id in ("p03", "p17", "p22"):
+        docs[doc_id] = topic_terms(rng, (int(doc_id[1:]) + 1) % 4, doc_id)    # moved to another topic
+        index.add(doc_id, docs[doc_id])
+    for doc_id in ("p05", "p06", "p31"):
+        del docs[doc_id]
+        index.remove(doc_id)
+    docs["p32"] = topic_terms(rng, 2, "p32")
+    index.add("p32", docs["p32"])
+    # small buckets: no sampling, so the incremental result is exactly what a rebuild computes
+    assert max(len(b) for b in index.buckets.values()) <= BUCKET_SAMPLE
+    assert len(docs) - 1 <= MAX_CANDIDATES
+    fresh = build(docs, order=sorted(docs, reverse=True))
+    assert index.sigs == fresh.sigs
+    assert index.buckets == fresh.buckets
+    assert index.top == fresh.top
+    check_consistent(index)
+
+def test_unchanged_terms_are_a_no_op():
+    index = build({"a": {"x", "y", "z"}, "b": {"x", "y", "w"}})
+    assert index.add("a", {"z", "y", "x"}) is False
+    assert index.add("a", {"x", "y"}) is True
+    assert index.related("b")[0][1] == "a"
+
+def test_bookkeeping_stays_consistent_under_sampling():
+    rng = random.Random(5)
+    docs = {f"p{i:03d}": topic_terms(rng, i % 3, i) for i in range(300)}
+    index = build(docs)
+    assert max(len(b) for b in index.buckets.values()) > BUCKET_SAMPLE
+    for step in range(200):
+        doc_id = rng.choice(sorted(docs))
+        if step % 3:
+            docs[doc_id] = topic_terms(rng, rng.randrange(3), f"{doc_id}-{step}")
+            index.add(doc_id, docs[doc_id])
+        else:
+            del docs[doc_id]
+            index.remove(doc_id)
+    check_consistent(index)
+    assert set(index.sigs) == set(docs)
+
+def test_json_round_trip():
+    rng = random.Random(9)
+    docs = {f"p{i:02d}": topic_terms(rng, i % 5, i) for i in range(60)}
+    index = build(docs)
+    loaded = RelatedIndex.from_json(json.loads(json.dumps(index.to_json())))
+    assert loaded.sigs == index.sigs
+    assert loaded.buckets == index.buckets
+    assert loaded.top == index.top
+    assert loaded.listed_by == index.listed_by
+    # and both keep evolving the same way
+    for target in (index, loaded):
+        target.add("new", topic_terms(random.Random(1), 0, "new"))
+        target.remove("p07")
+    assert loaded.top == index.top
+    check_consistent(loaded)
@@ -0,0 +1,38 @@
+# test_profiles.py
+# profile.json is written by hand; a malformed one is rejected instead of breaking the page or the chat engine.
+
+import json
+
+import pytest
+
+from answer_engine import AnswerEngine
+from profiles import load_profile
+from site_page import profile_values
+
+def write_profile(root, config, slug="demo"):
+    (root / slug).mkdir()
+    (root / slug / "profile.json").write_text(json.dumps(config), encoding="utf-8")
+    return load_profile(slug, str(root))
+
+def test_valid_profile_loads(tmp_path):
+    profile = write_profile(tmp_path, {"name": "Demo Person", "roles": ["tester"], "facts": {"hi": "hello"},
+                                       "faqs": [{"q": "where do you live", "a": "Pune", "keywords": ["city"]}]})
+    assert profile["first_name"] == "Demo"
+    assert profile_values(profile)["ROLES"] == '["tester"]'
+    engine = AnswerEngine.from_facts(profile["facts"], profile["faqs"], profile["first_name"])
+    assert engine.answer("which city do you live in") == "Pune"
+
+@pytest.mark.parametrize("extra", [
+    {"faqs": [{"q": "hello there"}]},
+    {"faqs": [{"q": "hello there", "a": 42}]},
+    {"faqs": ["hello there"]},
+    {"faqs": [{"q": "hello there", "a": "hi", "keywords": "greeting"}]},
+    {"faqs": {"q": "hello there", "a": "hi"}},
+    {"roles": 3},
+    {"roles": "tester"},
+    {"roles": ["tester", None]},
+    {"facts": {"hi": ["hello"]}},
+    {"tagline": {"text": "hi"}},
+])
+def test_malformed_profile_is_rejected(tmp_path, extra):
+    assert write_profile(tmp_path, dict({"name": "Demo Person"}, **extra)) is None
@@ -0,0 +1,27 @@
+# test_site_page.py
+# Placeholder filling: text from visitors (search queries, writings) must come out literally.
+
+import html
+import time
+
+from content import build_search_form_html, build_search_results_html, build_writings_html
+from site_page import DEFAULT_PROFILE, js_literal, render_page
+
+def test_search_query_with_placeholder_is_not_expanded():
+    query = "__ROLES__ __FACTS__"
+    posts_html = build_search_form_html(query) + build_search_results_html(query, [])
+    page = render_page("", posts_html, '{"secret": "facts"}')
+    assert f'value="{html.escape(query)}"' in page
+    assert page.count('"secret"') == 1     # only in `let FACTS = …`, not in the search box
+    assert page.count(js_literal(DEFAULT_PROFILE["roles"])) == 1
+
+def test_writing_with_placeholder_is_not_expanded():
+    writings = build_writings_html([{"text": "hello __FACTS__ __CONTENT_STATE__", "created": time.time()}])
+    page = render_page("", "", '{"secret": "facts"}', writings_html=writings, content_state="abc123")
+    assert "hello __FACTS__ __CONTENT_STATE__" in page
+    assert page.count('"secret"') == 1
+
+def test_all_known_placeholders_are_filled():
+    page = render_page("<p>g</p>", "<p>p</p>", "{}")
+    for name in ("GALLERY_HTML", "POSTS_HTML", "WRITINGS_HTML", "FACTS", "ROLES", "NAME", "YEAR", "CHAT_API"):
+        assert f"__{name}__" not in page
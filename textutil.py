@@ -0,0 +1,39 @@
+# textutil.py
+# Text normalisation shared by the chat answer engine and search indexes.
+# - Unicode-normalises and folds curly quotes/dashes, so "what’s aryan’s vibe" == "what's aryan's vibe"
+# - Lowercases and splits on anything that isn't a letter or digit
+# - Light suffix stemmer (plural / -ing / -ed / -ly) — enough to match "travelling" with "travel"
+
+import re
+import unicodedata
+
+QUOTE_MAP = str.maketrans({"‘": "'", "’": "'", "‚": "'", "′": "'", "“": '"', "”": '"', "„": '"', "–": "-", "—": "-"})
+TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+STOPWORDS = frozenset("""
+a an the is are am was were be been do does did to of and or in on at for with s me my about tell
+please can could would you your i it its that this there
+""".split())
+# kept as terms (they help tell "where" from "when" questions) but never enough on their own for a match
+INTERROGATIVES = frozenset("what who whom whose where when why how which".split())
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text or "").translate(QUOTE_MAP)
+    return text.lower()
+
+def stem(tok):
+    if len(tok) <= 3 or tok.isdigit():
+        return tok
+    for suffix, repl in (("ies", "y"), ("ing", ""), ("ed", ""), ("ly", ""), ("es", ""), ("s", "")):
+        if tok.endswith(suffix) and len(tok) - len(suffix) >= 3 and not tok.endswith("ss"):
+            tok = tok[:-len(suffix)] + repl
+            break
+    # "travelling" -> "travell" -> "travel"
+    if len(tok) > 3 and tok[-1] == tok[-2] and tok[-1] not in "aeiouls":
+        tok = tok[:-1]
+    elif len(tok) > 4 and tok.endswith("ll"):
+        tok = tok[:-1]
+    return tok
+
+def tokenize(text, stopwords=STOPWORDS, stemmed=True):
+    toks = TOKEN_RE.findall(normalize_text(text))
+    return [stem(t) if stemmed else t for t in toks if t not in stopwords]
@@ -0,0 +1,206 @@
+# writings.py
+# Store for the "Writings (Anonymous)" card: submissions from any session, newest-first pages for the page.
+# - SQLite in WAL mode (.cache/writings.sqlite3): readers never block the writer, and other processes can share the file
+# - One writer thread owns the write connection and group-commits: every submission queued while the previous
+#   commit was running goes into the next transaction, so throughput grows with load instead of lock contention
+# - submit() returns only after its batch has committed, so an acknowledged writing is never lost; if the writer
+#   fails (or the commit takes too long) it raises RuntimeError with a message fit for the page
+# - Pages are cached until the database changes (PRAGMA data_version also notices commits from other processes)
+# - Per-session token-bucket rate limiting; nothing that identifies the session is stored
+
+import os
+import time
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from content import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, "writings.sqlite3")
+PER_PAGE = 5
+MAX_PAGES = 16              # cached pages per data version
+BATCH_MAX = 256             # submissions per transaction at most
+SUBMIT_TIMEOUT = 10.0       # seconds to wait for the commit
+MIN_CHARS = 3
+MAX_CHARS = 2000
+RATE = 1 / 20               # tokens per second per session: one writing every 20s ...
+BURST = 3                   # ... after an initial burst of three
+MAX_BUCKETS = 10000         # idle sessions are forgotten past this many
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS writings (id INTEGER PRIMARY KEY, created REAL NOT NULL, text TEXT NOT NULL)"
+
+def connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # durable at checkpoints; a power cut can drop only the last commits
+    conn.execute(SCHEMA)
+    return conn
+
+def clean_text(text):
+    text = "\n".join(line.rstrip() for line in (text or "").replace("\r\n", "\n").split("\n")).strip()
+    if len(text) < MIN_CHARS:
+        raise ValueError("Write a little more before posting.")
+    if len(text) > MAX_CHARS:
+        raise ValueError(f"Writings are limited to {MAX_CHARS} characters.")
+    return text
+
+# ---------------- rate limiting ----------------
+class RateLimiter:
+    def __init__(self, rate=RATE, burst=BURST, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.buckets = {}   # key -> (tokens, last refill time)
+
+    def allow(self, key):
+        with self.lock:
+            now = self.clock()
+            tokens, last = self.buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return False
+            self.buckets[key] = (tokens - 1, now)
+            if len(self.buckets) > MAX_BUCKETS:
+                # a bucket idle long enough to refill completely carries no state worth keeping
+                full = self.burst / self.rate
+                self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < full}
+            return True
+
+    def wait_time(self, key):
+        with self.lock:
+            tokens, last = self.buckets.get(key, (self.burst, self.clock()))
+            tokens = min(self.burst, tokens + (self.clock() - last) * self.rate)
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+# ---------------- store ----------------
+class WritingStore:
+    def __init__(self, path=DB_PATH, limiter=None, batch_max=BATCH_MAX):
+        self.path = path
+        self.limiter = limiter or RateLimiter()
+        self.batch_max = batch_max
+        self.lock = threading.RLock()
+        self.queue = queue.Queue()
+        self.writer = None
+        self.reader = None
+        self.data_version = None
+        self.version = 0            # bumped whenever the table changes (feeds page cache keys)
+        self.pages = {}             # (number, per_page) -> (entries, number, pages) for the current version
+        self.batches = self.committed = 0
+
+    # ---------------- writes ----------------
+    def _start_writer(self):
+        with self.lock:
+            if self.writer is None or not self.writer.is_alive():
+                self.writer = threading.Thread(target=self._write_loop, name="writings-writer", daemon=True)
+                self.writer.start()
+
+    def _write_loop(self):
+        batch = []
+        try:
+            conn = connect(self.path)
+            while True:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_max:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(item is None for item in batch)
+                batch = [item for item in batch if item is not None]
+                if batch:
+                    try:
+                        conn.execute("BEGIN IMMEDIATE")
+                        ids = [conn.execute("INSERT INTO writings (created, text) VALUES (?, ?)",
+                                            (created, text)).lastrowid for created, text, _ in batch]
+                        conn.execute("COMMIT")
+                    except sqlite3.Error as e:
+                        if conn.in_transaction:
+                            conn.execute("ROLLBACK")
+                        for _, _, fut in batch:
+                            fut.set_exception(e)
+                    else:
+                        self.batches += 1
+                        self.committed += len(batch)
+                        for writing_id, (created, text, fut) in zip(ids, batch):
+                            fut.set_result({"id": writing_id, "created": created, "text": text})
+                if stop:
+                    conn.close()
+                    return
+        except Exception as e:
+            # the thread is going away (e.g. the database can't be opened): fail its batch and everything queued
+            # instead of leaving submitters to their timeout; the next submit() starts a new writer
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is not None and not item[2].done():
+                    item[2].set_exception(e)
+
+    def submit(self, text, session=None, timeout=SUBMIT_TIMEOUT):
+        """Store one writing; raises ValueError when it is rejected (too short/long, rate limited)
+        and RuntimeError when it couldn't be stored."""
+        text = clean_text(text)
+        if session is not None and not self.limiter.allow(session):
+            wait = self.limiter.wait_time(session)
+            raise ValueError(f"Slow down a little — you can post again in {max(1, round(wait))}s.")
+        fut = Future()
+        self._start_writer()
+        self.queue.put((time.time(), text, fut))
+        try:
+            return fut.result(timeout)
+        except (FutureTimeout, sqlite3.Error, OSError) as e:
+            raise RuntimeError("Couldn't save your writing right now — please try again in a moment.") from e
+
+    def close(self):
+        with self.lock:
+            if self.writer is not None and self.writer.is_alive():
+                self.queue.put(None)
+                self.writer.join()
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    # ---------------- reads ----------------
+    def refresh(self):
+        """Drop cached pages if anything (this process or another) committed since the last call."""
+        with self.lock:
+            if self.reader is None:
+                self.reader = connect(self.path)
+            dv = self.reader.execute("PRAGMA data_version").fetchone()[0]
+            if dv != self.data_version:
+                self.data_version = dv
+                self.version += 1
+                self.pages = {}
+                return True
+            return False
+
+    def page(self, number, per_page=PER_PAGE):
+        with self.lock:
+            self.refresh()
+            key = (number, per_page)
+            cached = self.pages.get(key)
+            if cached is not None:
+                return cached
+            total = self.reader.execute("SELECT COUNT(*) FROM writings").fetchone()[0]
+            pages = max(1, -(-total // per_page))
+            number = min(max(1, number), pages)
+            rows = self.reader.execute("SELECT id, created, text FROM writings ORDER BY id DESC LIMIT ? OFFSET ?",
+                                       (per_page, (number - 1) * per_page)).fetchall()
+            result = ([{"id": r[0], "created": r[1], "text": r[2]} for r in rows], number, pages)
+            self.pages[key] = result
+            while len(self.pages) > MAX_PAGES:
+                self.pages.pop(next(iter(self.pages)))
+            return result
+
+    def stats(self):
+        return {"batches": self.batches, "committed": self.committed,
+                "avg_batch": (self.committed / self.batches) if self.batches else 0.0, "queued": self.queue.qsize()}
+
+# shared instance, like content_cache.cache: every session in the process submits through one writer thread
+store = WritingStore()
@@ -0,0 +1,86 @@
+# writings_loadtest.py
+# Load test for the anonymous writings store (writings.py).
+# - N threads stand in for concurrent Streamlit sessions, each submitting writings back to back for a fixed time
+#   (rate limiting is bypassed: every submission gets a fresh session key)
+# - Optional reader threads page through the card view at the same time, like visitors loading the page
+# - Reports sustained submissions/s, submit latency percentiles, commits/batch sizes,
+#   and checks that every acknowledged writing is in the database
+#
+# Usage:  python writings_loadtest.py [--sessions 32] [--seconds 5] [--readers 4] [--db path]
+# Without --db a throwaway database in a temp directory is used.
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+from instrument import percentile
+from writings import RateLimiter, WritingStore
+
+READ_PAUSE = 0.002          # seconds between a reader's page loads (a tight loop would just starve the writers of the GIL)
+
+def submitter(store, deadline, latencies, acked, n):
+    i = 0
+    while time.monotonic() < deadline:
+        t = time.perf_counter()
+        rec = store.submit(f"load test writing {n}-{i}: the quick brown fox jumps over the lazy dog", session=f"{n}-{i}")
+        latencies.append(time.perf_counter() - t)
+        acked.append(rec["id"])
+        i += 1
+
+def reader(store, deadline, counter):
+    while time.monotonic() < deadline:
+        store.page(1 + counter[0] % 3)
+        counter[0] += 1
+        time.sleep(READ_PAUSE)
+
+def run(path, sessions, seconds, readers):
+    store = WritingStore(path, limiter=RateLimiter(rate=1e9, burst=1e9))
+    store.refresh()
+    deadline = time.monotonic() + seconds
+    latencies, acked, reads = [], [], [0]
+    threads = [threading.Thread(target=submitter, args=(store, deadline, latencies, acked, n)) for n in range(sessions)]
+    threads += [threading.Thread(target=reader, args=(store, deadline, reads)) for _ in range(readers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    store.close()
+
+    with sqlite3.connect(path) as conn:
+        stored = {row[0] for row in conn.execute("SELECT id FROM writings")}
+    lost = len(set(acked) - stored)
+    lat = sorted(latencies)
+    stats = store.stats()
+    print(f"sessions={sessions} readers={readers} duration={elapsed:.2f}s")
+    print(f"  submissions   {len(acked)}  ({len(acked) / elapsed:,.0f}/s sustained)")
+    print(f"  submit        p50 {percentile(lat, 50) * 1e3:.2f} ms  p99 {percentile(lat, 99) * 1e3:.2f} ms  "
+          f"max {(lat[-1] if lat else 0) * 1e3:.2f} ms")
+    print(f"  commits       {stats['batches']}  (avg {stats['avg_batch']:.1f} writings per commit)")
+    print(f"  page reads    {reads[0]}  ({reads[0] / elapsed:,.0f}/s)")
+    print(f"  lost writes   {lost}")
+    return 1 if lost else 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test concurrent anonymous writing submissions.")
+    ap.add_argument("--sessions", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--db", help="database to write to (default: a temporary one)")
+    args = ap.parse_args(argv)
+    if args.db:
+        return run(args.db, args.sessions, args.seconds, args.readers)
+    root = tempfile.mkdtemp(prefix="writings-load-")
+    try:
+        return run(os.path.join(root, "writings.sqlite3"), args.sessions, args.seconds, args.readers)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())